@@ -4,11 +4,9 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 from bond import Bond
 from calculator import (
-    calculate_dv01,
     calculate_effective_duration,
+    calculate_sensitivities,
     calculate_ytm,
-    calculate_duration,
-    calculate_convexity,
 )
 from portfolio import BondPortfolio
 from live_data import fetch_bond_data
@@ -358,10 +356,11 @@ def main():
                 )
 
                 ytm = calculate_ytm(bond)
-                md = calculate_duration(bond, ytm)
-                cv = calculate_convexity(bond, ytm)
+                sens = calculate_sensitivities(bond, ytm)
+                md = sens["duration"]
+                cv = sens["convexity"]
                 ai = bond.calculate_accrued_interest()
-                dv = calculate_dv01(bond, ytm)
+                dv = sens["dv01"]
                 ed = calculate_effective_duration(bond, ytm, shift_bps)
 
                 st.markdown("**Bond Analytics**")
@@ -393,6 +392,10 @@ def main():
             st.metric(
                 "Wtd Avg YTM (%)", f"{portfolio.calculate_weighted_ytm()*100:.2f}"
             )
+            st.metric(
+                "Portfolio Yield (%)",
+                f"{portfolio.calculate_portfolio_yield()*100:.2f}",
+            )
         with s3:
             st.metric(
                 "Wtd Duration (yrs)", f"{portfolio.calculate_weighted_duration():.2f}"
@@ -0,0 +1,168 @@
+# backfill.py
+from datetime import date, timedelta
+
+import numpy as np
+
+from vectorized import (
+    bonds_to_arrays,
+    calculate_risk_vec,
+    calculate_ytm_vec,
+    nominal_from_effective,
+)
+
+
+def date_range(start: date, end: date, step_days=1, weekdays_only=True):
+    """
+    Dates from `start` to `end` inclusive, optionally skipping weekends.
+    """
+    dates = []
+    current = start
+    while current <= end:
+        if not weekdays_only or current.weekday() < 5:
+            dates.append(current)
+        current += timedelta(days=step_days)
+    return dates
+
+
+def age_arrays(arrays, elapsed_days):
+    """
+    Column arrays as of `elapsed_days` after the arrays' as-of date (one entry per row),
+    with remaining_years, payment count and days_since_last_coupon rolled forward.
+    Bonds that have matured keep zero remaining periods.
+    """
+    elapsed_days = np.asarray(elapsed_days, dtype=float)
+    freq = arrays["frequency"]
+    remaining = np.maximum(arrays["remaining_years"] - elapsed_days / 365.0, 0.0)
+    period_days = 365.0 / freq
+    aged = dict(arrays)
+    aged["remaining_years"] = remaining
+    aged["periods"] = (remaining * freq).astype(np.int64)
+    aged["days_since_last_coupon"] = np.mod(
+        arrays["days_since_last_coupon"] + elapsed_days, period_days
+    )
+    return aged
+
+
+def _tile(arrays, repeats):
+    return {key: np.tile(values, repeats) for key, values in arrays.items()}
+
+
+def _curve_prices(arrays, curve):
+    """
+    Clean prices implied by discounting each row's scheduled cash flows on `curve`.
+    Bonds sharing a payment frequency share one cumulative discount-factor ladder.
+    """
+    freq = arrays["frequency"]
+    periods = arrays["periods"]
+    prices = np.zeros(len(freq))
+    for f in np.unique(freq):
+        rows = freq == f
+        n = periods[rows]
+        discount = curve.discount_factor(np.arange(int(n.max(initial=0)) + 1) / f)
+        annuity = np.concatenate([[0.0], np.cumsum(discount[1:])])
+        prices[rows] = (
+            arrays["coupon"][rows] * annuity[n]
+            + arrays["face_value"][rows] * discount[n]
+        )
+    return prices
+
+
+def backfill(
+    bonds,
+    as_of: date,
+    dates,
+    prices=None,
+    curves=None,
+    block_size=32,
+    keep_positions=False,
+):
+    """
+    Re-evaluate a portfolio on each of `dates`, ageing every bond from `as_of`.
+
+    Prices on each date come from `prices`, either an (n_dates, n_bonds) array or a
+    callable (date, aged_arrays) -> price array; or, failing that, from `curves`, a
+    callable date -> `frn.ForwardCurve` used to discount the aged cash flows. With
+    neither, each bond's price is held at its as-of value.
+
+    Dates are solved `block_size` at a time as one vectorized YTM solve, warm-started
+    from the previous block's last solution. Returns a dict of arrays indexed by date:
+    dates, clean_value, weighted_ytm, weighted_duration, weighted_convexity, total_dv01;
+    with `keep_positions`, also per-bond ytm/duration/convexity as float32
+    (n_dates, n_bonds) matrices.
+    """
+    base = bonds if isinstance(bonds, dict) else bonds_to_arrays(bonds)
+    n_bonds = len(base["price"])
+    dates = list(dates)
+    n_dates = len(dates)
+    series = {
+        "dates": np.array(dates, dtype="datetime64[D]"),
+        "clean_value": np.zeros(n_dates),
+        "weighted_ytm": np.zeros(n_dates),
+        "weighted_duration": np.zeros(n_dates),
+        "weighted_convexity": np.zeros(n_dates),
+        "total_dv01": np.zeros(n_dates),
+    }
+    if keep_positions:
+        for key in ("ytm", "duration", "convexity"):
+            series[key] = np.zeros((n_dates, n_bonds), dtype=np.float32)
+
+    warm = None
+    for start in range(0, n_dates, block_size):
+        block = dates[start : start + block_size]
+        size = len(block)
+        elapsed = np.repeat([(d - as_of).days for d in block], n_bonds)
+        arrays = age_arrays(_tile(base, size), elapsed)
+
+        if prices is not None:
+            if callable(prices):
+                block_prices = [
+                    prices(d, age_arrays(base, np.full(n_bonds, (d - as_of).days)))
+                    for d in block
+                ]
+            else:
+                block_prices = prices[start : start + size]
+            arrays["price"] = np.asarray(block_prices, dtype=float).reshape(-1)
+        elif curves is not None:
+            arrays["price"] = np.concatenate(
+                [
+                    _curve_prices(
+                        age_arrays(base, np.full(n_bonds, (d - as_of).days)),
+                        curves(d),
+                    )
+                    for d in block
+                ]
+            )
+
+        # Bonds inside their last coupon period still have value; like analyze_arrays,
+        # they are solved and priced with zero whole periods left
+        alive = arrays["remaining_years"] > 0
+        initial = None if warm is None else np.tile(warm, size)[alive]
+        live = {key: values[alive] for key, values in arrays.items()}
+        ytm = np.zeros(len(alive))
+        ytm[alive] = calculate_ytm_vec(live, initial=initial)
+        # Matured bonds carry no risk; keep their last yield as the next warm start
+        last = ytm[-n_bonds:]
+        solved = nominal_from_effective(last, base["frequency"])
+        warm = solved if warm is None else np.where(alive[-n_bonds:], solved, warm)
+
+        duration = np.zeros(len(alive))
+        convexity = np.zeros(len(alive))
+        duration[alive], convexity[alive] = calculate_risk_vec(live, ytm[alive])
+
+        value = np.where(alive, arrays["price"], 0.0).reshape(size, n_bonds)
+        duration = duration.reshape(size, n_bonds)
+        convexity = convexity.reshape(size, n_bonds)
+        ytm = ytm.reshape(size, n_bonds)
+        total = value.sum(axis=1)
+        safe = np.where(total > 0, total, 1.0)
+        rows = slice(start, start + size)
+        series["clean_value"][rows] = total
+        series["weighted_ytm"][rows] = (ytm * value).sum(axis=1) / safe
+        series["weighted_duration"][rows] = (duration * value).sum(axis=1) / safe
+        series["weighted_convexity"][rows] = (convexity * value).sum(axis=1) / safe
+        series["total_dv01"][rows] = (duration * value).sum(axis=1) * 0.0001
+        if keep_positions:
+            series["ytm"][rows] = ytm
+            series["duration"][rows] = duration
+            series["convexity"][rows] = convexity
+    return series
@@ -0,0 +1,203 @@
+# batch_report.py
+import argparse
+import csv
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from bond_book import BondBook, bond_from_record
+from cashflows import CashFlowAggregate
+from frn import ForwardCurve, solve_discount_margins
+from vectorized import analyze_arrays, bonds_to_arrays
+
+PORTFOLIO_EXTENSIONS = (".csv", ".book")
+SUMMARY_FIELDS = [
+    "portfolio",
+    "status",
+    "seconds",
+    "number_of_bonds",
+    "total_clean_value",
+    "total_dirty_value",
+    "weighted_ytm",
+    "portfolio_yield",
+    "weighted_duration",
+    "weighted_convexity",
+    "total_dv01",
+    "average_discount_margin",
+    "unsolved_discount_margins",
+    "error",
+]
+
+# Set once per worker process by _init_worker so market data is parsed a single time
+_CURVE = None
+
+
+def _init_worker(yield_curve):
+    global _CURVE
+    _CURVE = ForwardCurve.from_yield_curve(yield_curve) if yield_curve else None
+
+
+def load_bonds(path):
+    """
+    Bonds from a portfolio file: a CSV of `Bond` constructor arguments or a bond book.
+    """
+    if path.endswith(".book"):
+        return BondBook(path).bonds()
+    with open(path, newline="") as f:
+        return [bond_from_record(row) for row in csv.DictReader(f)]
+
+
+def load_arrays(path):
+    """
+    Column arrays for a portfolio file, plus `Bond` objects for just its floating-rate
+    rows (discount margins need them). Bond books are read through their memory map.
+    """
+    if path.endswith(".book"):
+        book = BondBook(path)
+        arrays = book.arrays()
+        rows = np.flatnonzero(arrays["bond_type"] == "floating")
+        return arrays, [book.bond(i) for i in rows]
+    bonds = load_bonds(path)
+    return bonds_to_arrays(bonds), [b for b in bonds if b.bond_type == "floating"]
+
+
+def summarize_arrays(arrays, results):
+    """
+    The `BondPortfolio.summary` figures computed straight from column arrays and
+    their `analyze_arrays` results.
+    """
+    price = arrays["price"]
+    total_clean = float(price.sum())
+    cash_flows = CashFlowAggregate()
+    cash_flows.add_arrays(arrays)
+
+    def weighted(values):
+        return float(values @ price / total_clean) if total_clean else 0.0
+
+    return {
+        "number_of_bonds": len(price),
+        "total_clean_value": total_clean,
+        "total_dirty_value": float(results["dirty_price"].sum()),
+        "weighted_ytm": weighted(results["ytm"]),
+        "portfolio_yield": cash_flows.irr(),
+        "weighted_duration": weighted(results["duration"]),
+        "weighted_convexity": weighted(results["convexity"]),
+    }
+
+
+def evaluate_portfolio(path):
+    """
+    Build and summarize one portfolio. Never raises: failures come back as an
+    entry with status "error" so the rest of the batch keeps going.
+    """
+    started = time.perf_counter()
+    entry = {"portfolio": os.path.basename(path)}
+    try:
+        arrays, floaters = load_arrays(path)
+        results = analyze_arrays(arrays)
+        entry.update(summarize_arrays(arrays, results))
+        entry["total_dv01"] = float(results["dv01"].sum())
+        if _CURVE is not None and floaters:
+            margins = solve_discount_margins(floaters, _CURVE)
+            solved = margins[~np.isnan(margins)]
+            if len(solved):
+                entry["average_discount_margin"] = float(solved.mean())
+            entry["unsolved_discount_margins"] = int(len(margins) - len(solved))
+        entry["status"] = "ok"
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = f"{type(e).__name__}: {e}"
+        entry["traceback"] = traceback.format_exc()
+    entry["seconds"] = time.perf_counter() - started
+    return entry
+
+
+def find_portfolios(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(PORTFOLIO_EXTENSIONS)
+    )
+
+
+def run_batch(directory, workers=None, yield_curve=None):
+    """
+    Evaluate every portfolio file in `directory` across a process pool.
+    `yield_curve` is a {"1M": 5.3, ...} dict (see fred_fetch.fetch_yield_curve) shared
+    with every worker; it enables discount margins for floating-rate bonds.
+    Returns one summary entry per portfolio, in file-name order.
+    """
+    paths = find_portfolios(directory)
+    entries = {}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(yield_curve,)
+    ) as pool:
+        futures = {pool.submit(evaluate_portfolio, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                entries[path] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed or out of memory)
+                entries[path] = {
+                    "portfolio": os.path.basename(path),
+                    "status": "error",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+    return [entries[path] for path in paths]
+
+
+def write_reports(entries, out_dir, total_seconds=None):
+    """
+    Write summary.json (full entries plus run totals) and summary.csv (one row per portfolio).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    failed = sum(entry["status"] != "ok" for entry in entries)
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump(
+            {
+                "portfolios": len(entries),
+                "succeeded": len(entries) - failed,
+                "failed": failed,
+                "total_seconds": total_seconds,
+                "results": entries,
+            },
+            f,
+            indent=2,
+        )
+    with open(os.path.join(out_dir, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nightly batch portfolio reports")
+    parser.add_argument("directory", help="Directory of portfolio .csv/.book files")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--market-data", help='JSON yield curve, e.g. {"1M": 5.3, "10Y": 4.2}'
+    )
+    args = parser.parse_args()
+
+    yield_curve = None
+    if args.market_data:
+        with open(args.market_data) as f:
+            yield_curve = json.load(f)
+
+    started = time.perf_counter()
+    entries = run_batch(args.directory, args.workers, yield_curve)
+    total = time.perf_counter() - started
+    write_reports(entries, args.out, total)
+    failed = sum(entry["status"] != "ok" for entry in entries)
+    print(f"Evaluated {len(entries)} portfolios in {total:.2f}s ({failed} failed)")
+    print(f"Reports written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
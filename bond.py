@@ -31,7 +31,7 @@ class Bond:
         self.quoted_spread = quoted_spread
 
     def get_coupon_payment(self):
-        if self.bond_type == "fixed":
+        if self.bond_type in ("fixed", "callable", "putable"):
             return self.face_value * self.coupon_rate / self.payment_frequency
         elif self.bond_type == "floating":
             effective_rate = self.market_reference_rate + self.quoted_spread
@@ -62,3 +62,43 @@ class Bond:
             accrued_interest = -accrued_interest
 
         return accrued_interest
+
+
+class CallableBond(Bond):
+    def __init__(self, *args, call_schedule=None, put_schedule=None, **kwargs):
+        """
+        Fixed-coupon bond with embedded options.
+        Schedules are lists of (years_from_now, strike_price); each strike applies
+        from its start date until the next entry, exercisable on coupon dates.
+        """
+        self.call_schedule = sorted(call_schedule or [])
+        self.put_schedule = sorted(put_schedule or [])
+        if "bond_type" not in kwargs:
+            kwargs["bond_type"] = (
+                "putable"
+                if self.put_schedule and not self.call_schedule
+                else "callable"
+            )
+        super().__init__(*args, **kwargs)
+
+    def call_price_at(self, years):
+        """
+        Call strike in force at `years` from now, or None if not callable then.
+        """
+        return _strike_at(self.call_schedule, years)
+
+    def put_price_at(self, years):
+        """
+        Put strike in force at `years` from now, or None if not putable then.
+        """
+        return _strike_at(self.put_schedule, years)
+
+
+def _strike_at(schedule, years):
+    strike = None
+    for start, price in schedule:
+        if start <= years + 1e-9:
+            strike = price
+        else:
+            break
+    return strike
@@ -0,0 +1,269 @@
+# bond_book.py
+import csv
+import json
+import struct
+
+import numpy as np
+
+from bond import Bond, CallableBond
+from vectorized import DAY_COUNT_BASIS
+
+MAGIC = b"BONDBOOK"
+VERSION = 1
+# magic, version, row count, header length (bytes, including this prefix)
+PREFIX = struct.Struct("<8sIQI")
+ALIGNMENT = 64
+
+DAY_COUNT_CODES = ["actual/365", "actual/360", "30/360"]
+BOND_TYPE_CODES = ["fixed", "floating", "callable", "putable"]
+SIDE_CODES = ["buyer", "seller"]
+
+COLUMNS = [
+    ("face_value", "<f8"),
+    ("coupon_rate", "<f8"),
+    ("total_maturity_years", "<f8"),
+    ("remaining_years", "<f8"),
+    ("price", "<f8"),
+    ("payment_frequency", "<i4"),
+    ("days_since_last_coupon", "<f8"),
+    ("market_reference_rate", "<f8"),
+    ("quoted_spread", "<f8"),
+    ("day_count_code", "<u1"),
+    ("bond_type_code", "<u1"),
+    ("side_code", "<u1"),
+]
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(count, schedules=None):
+    """
+    Byte offset of each column for a book of `count` rows, after the JSON header.
+    """
+    header = {
+        "columns": [],
+        "codes": {
+            "day_count": DAY_COUNT_CODES,
+            "bond_type": BOND_TYPE_CODES,
+            "side": SIDE_CODES,
+        },
+    }
+    if schedules:
+        header["schedules"] = schedules
+    # Offsets depend on the header size; size it with placeholder offsets plus room for digits
+    placeholder = [{"name": n, "dtype": d, "offset": 0} for n, d in COLUMNS]
+    header["columns"] = placeholder
+    base = _align(PREFIX.size + len(json.dumps(header)) + 32 * len(COLUMNS))
+    offset = base
+    columns = []
+    for name, dtype in COLUMNS:
+        columns.append({"name": name, "dtype": dtype, "offset": offset})
+        offset = _align(offset + np.dtype(dtype).itemsize * count)
+    header["columns"] = columns
+    return header, base, offset
+
+
+def write_book(path, columns, schedules=None):
+    """
+    Write a bond book from a dict of equal-length column arrays keyed by `COLUMNS` names.
+    Missing optional columns default to zero (buyer side, actual/365, fixed).
+    `schedules` is the variable-length side table of embedded options, stored in the
+    header as {row: {"call": [[years, strike], ...], "put": [...]}} for the rows that
+    have them.
+    """
+    count = len(columns["face_value"])
+    schedules = {str(row): value for row, value in (schedules or {}).items()}
+    header, base, end = _layout(count, schedules)
+    encoded = json.dumps(header).encode()
+    if PREFIX.size + len(encoded) > base:
+        raise ValueError("Bond book header does not fit before the first column")
+
+    with open(path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, count, PREFIX.size + len(encoded)))
+        f.write(encoded)
+        for spec in header["columns"]:
+            values = columns.get(spec["name"])
+            if values is None:
+                values = np.zeros(count, dtype=spec["dtype"])
+            data = np.ascontiguousarray(values, dtype=spec["dtype"])
+            if data.shape != (count,):
+                raise ValueError(f"Column {spec['name']} has shape {data.shape}")
+            f.seek(spec["offset"])
+            f.write(data.tobytes())
+        f.truncate(end)
+
+
+def write_book_from_bonds(path, bonds):
+    """
+    Convert `Bond` objects to a bond book file.
+    """
+    bonds = list(bonds)
+    columns = {
+        name: [getattr(b, name) for b in bonds]
+        for name, _ in COLUMNS
+        if not name.endswith("_code")
+    }
+    # Like `Bond`, treat an unrecognized day count as actual/365 and any side other
+    # than seller as buyer
+    columns["day_count_code"] = [
+        DAY_COUNT_CODES.index(
+            b.day_count_convention
+            if b.day_count_convention in DAY_COUNT_CODES
+            else "actual/365"
+        )
+        for b in bonds
+    ]
+    columns["side_code"] = [
+        SIDE_CODES.index("seller" if b.buyer_or_seller == "seller" else "buyer")
+        for b in bonds
+    ]
+    columns["bond_type_code"] = []
+    for i, b in enumerate(bonds):
+        if b.bond_type not in BOND_TYPE_CODES:
+            raise ValueError(
+                f"Bond {i}: bond_type {b.bond_type!r} is not one of "
+                f"{', '.join(BOND_TYPE_CODES)}"
+            )
+        columns["bond_type_code"].append(BOND_TYPE_CODES.index(b.bond_type))
+    schedules = {}
+    for i, b in enumerate(bonds):
+        call = getattr(b, "call_schedule", None)
+        put = getattr(b, "put_schedule", None)
+        if call or put:
+            schedules[i] = {
+                "call": [[float(y), float(k)] for y, k in call or []],
+                "put": [[float(y), float(k)] for y, k in put or []],
+            }
+    write_book(path, columns, schedules)
+
+
+def write_book_from_csv(path, csv_path):
+    """
+    Convert a CSV of `Bond` constructor arguments (one bond per row) to a bond book file.
+    """
+    with open(csv_path, newline="") as f:
+        bonds = [bond_from_record(row) for row in csv.DictReader(f)]
+    write_book_from_bonds(path, bonds)
+
+
+def bond_from_record(row) -> Bond:
+    """
+    Build a `Bond` from a dict of string fields, as read from a CSV row.
+    """
+    return Bond(
+        face_value=float(row["face_value"]),
+        coupon_rate=float(row.get("coupon_rate") or 0.0),
+        total_maturity_years=float(row["total_maturity_years"]),
+        remaining_years=float(row["remaining_years"]),
+        clean_price=float(row["clean_price"]),
+        payment_frequency=int(row.get("payment_frequency") or 2),
+        days_since_last_coupon=float(row.get("days_since_last_coupon") or 0),
+        buyer_or_seller=row.get("buyer_or_seller") or "buyer",
+        day_count_convention=row.get("day_count_convention") or "actual/365",
+        bond_type=row.get("bond_type") or "fixed",
+        market_reference_rate=float(row.get("market_reference_rate") or 0.0),
+        quoted_spread=float(row.get("quoted_spread") or 0.0),
+    )
+
+
+class BondBook:
+    def __init__(self, path, mode="r"):
+        """
+        Memory-mapped view of a bond book file. Columns are `np.memmap` slices of the
+        file, so opening is constant-time and processes mapping the same file share pages.
+        """
+        with open(path, "rb") as f:
+            prefix = f.read(PREFIX.size)
+            magic, version, count, header_end = PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a bond book file")
+            if version != VERSION:
+                raise ValueError(f"Unsupported bond book version {version}")
+            header = json.loads(f.read(header_end - PREFIX.size))
+        self.path = path
+        self.count = count
+        self.codes = header["codes"]
+        self.schedules = header.get("schedules", {})
+        self.columns = {}
+        for spec in header["columns"]:
+            self.columns[spec["name"]] = (
+                np.memmap(
+                    path,
+                    dtype=spec["dtype"],
+                    mode=mode,
+                    offset=spec["offset"],
+                    shape=(count,),
+                )
+                if count
+                else np.zeros(0, dtype=spec["dtype"])
+            )
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def arrays(self) -> dict:
+        """
+        Columns in the shape `vectorized` expects, so a book can be analyzed without
+        building any `Bond` objects.
+        """
+        c = self.columns
+        freq = c["payment_frequency"].astype(float)
+        rate = np.where(
+            c["bond_type_code"] == BOND_TYPE_CODES.index("floating"),
+            c["market_reference_rate"] + c["quoted_spread"],
+            c["coupon_rate"],
+        )
+        basis = np.array([DAY_COUNT_BASIS[name] for name in self.codes["day_count"]])
+        return {
+            "face_value": c["face_value"],
+            "coupon": c["face_value"] * rate / freq,
+            "frequency": freq,
+            "periods": (c["remaining_years"] * freq).astype(np.int64),
+            "remaining_years": c["remaining_years"],
+            "price": c["price"],
+            "days_since_last_coupon": c["days_since_last_coupon"],
+            "days_in_period": basis[c["day_count_code"]] / freq,
+            "sign": np.where(c["side_code"] == SIDE_CODES.index("seller"), -1.0, 1.0),
+            "bond_type": np.asarray(self.codes["bond_type"])[c["bond_type_code"]],
+            "day_count": np.asarray(self.codes["day_count"])[c["day_count_code"]],
+        }
+
+    def bond(self, i) -> Bond:
+        """
+        The `Bond` in row `i`; a `CallableBond` with its schedules when it has embedded
+        options.
+        """
+        c = self.columns
+        fields = dict(
+            face_value=float(c["face_value"][i]),
+            coupon_rate=float(c["coupon_rate"][i]),
+            total_maturity_years=float(c["total_maturity_years"][i]),
+            remaining_years=float(c["remaining_years"][i]),
+            clean_price=float(c["price"][i]),
+            payment_frequency=int(c["payment_frequency"][i]),
+            days_since_last_coupon=float(c["days_since_last_coupon"][i]),
+            buyer_or_seller=self.codes["side"][c["side_code"][i]],
+            day_count_convention=self.codes["day_count"][c["day_count_code"][i]],
+            bond_type=self.codes["bond_type"][c["bond_type_code"][i]],
+            market_reference_rate=float(c["market_reference_rate"][i]),
+            quoted_spread=float(c["quoted_spread"][i]),
+        )
+        options = self.schedules.get(str(int(i)))
+        if options is None:
+            return Bond(**fields)
+        return CallableBond(
+            call_schedule=[tuple(entry) for entry in options["call"]],
+            put_schedule=[tuple(entry) for entry in options["put"]],
+            **fields,
+        )
+
+    def bonds(self):
+        """
+        Materialize `Bond` objects, for code that still needs them.
+        """
+        return [self.bond(i) for i in range(self.count)]
@@ -1,5 +1,8 @@
 # calculator.py
+import numpy as np
+
 from bond import Bond
+from dual import Dual2
 
 
 def price_from_ytm(bond: Bond, ytm: float) -> float:
@@ -18,11 +21,50 @@ def price_from_ytm(bond: Bond, ytm: float) -> float:
     return pv
 
 
-def calculate_ytm(bond: Bond, tol=1e-6, max_iter=1000, high_ytm_threshold=0.5) -> float:
+def price_sensitivities(bond: Bond, ytm: float):
+    """
+    Theoretical clean price and its first and second derivatives with respect to the
+    annualized yield, from a single dual-number evaluation of the cash-flow sum.
+    Returns (price, dP/dy, d2P/dy2).
+    """
+    freq = bond.payment_frequency
+    coupon = bond.get_coupon_payment()
+    periods = int(bond.get_number_of_payments())
+    y = Dual2.variable(float(ytm))
+    discount = 1.0 / (1 + y / freq)
+    t = np.arange(1, periods + 1)
+    pv = (coupon * discount**t).sum() + bond.face_value * discount**periods
+    return float(pv.value), float(pv.d1), float(pv.d2)
+
+
+def calculate_sensitivities(bond: Bond, ytm: float) -> dict:
+    """
+    Model price, modified duration, convexity and DV01 from one pricing pass.
+    Duration and convexity are taken relative to the bond's market price, as in
+    calculate_duration and calculate_convexity.
+    """
+    price, d1, d2 = price_sensitivities(bond, ytm)
+    duration = -d1 / bond.price
+    return {
+        "model_price": price,
+        "duration": duration,
+        "convexity": d2 / bond.price,
+        "dv01": duration * bond.price * 0.0001,
+    }
+
+
+def calculate_ytm(
+    bond: Bond, tol=1e-6, max_iter=1000, high_ytm_threshold=0.5, grid_cache=None
+) -> float:
     """
     Calculate bond's Yield to Maturity using Newton-Raphson and Bisection fallback.
+    Newton steps use the exact dP/dy from price_sensitivities.
+    Pass a ytm_grid.YieldGridCache as `grid_cache` to answer bonds with a common
+    structure by grid interpolation instead.
     Returns an annualized YTM.
     """
+    if grid_cache is not None:
+        return grid_cache.calculate_ytm(bond)
     price = bond.price
     face_value = bond.face_value
     coupon = bond.get_coupon_payment()
@@ -38,13 +80,11 @@ def calculate_ytm(bond: Bond, tol=1e-6, max_iter=1000, high_ytm_threshold=0.5) -
 
     # Newton-Raphson iteration
     for _ in range(max_iter):
-        calc_price = price_from_ytm(bond, ytm)
+        calc_price, derivative, _ = price_sensitivities(bond, ytm)
         diff = price - calc_price
         if abs(diff) < tol:
             periodic = ytm
             return (1 + periodic / freq) ** freq - 1
-        delta = 1e-6
-        derivative = (price_from_ytm(bond, ytm + delta) - calc_price) / delta
         if derivative == 0:  # Avoid division by zero
             break
         ytm += diff / derivative
@@ -70,44 +110,18 @@ def calculate_ytm(bond: Bond, tol=1e-6, max_iter=1000, high_ytm_threshold=0.5) -
 
 def calculate_duration(bond: Bond, ytm: float) -> float:
     """
-    Modified duration = Macaulay duration / (1 + ytm_periodic).
+    Modified duration = Macaulay duration / (1 + ytm_periodic) = -(dP/dy) / price.
     """
-    price = bond.price
-    coupon = bond.get_coupon_payment()
-    periods = int(bond.get_number_of_payments())
-    freq = bond.payment_frequency
-    ytm_p = ytm / freq
-    discount = 1.0 / (1 + ytm_p)
-
-    macaulay = 0.0
-    for t in range(periods):
-        time = (t + 1) / freq
-        pv = coupon * (discount ** (t + 1))
-        macaulay += time * pv
-    macaulay += (periods / freq) * bond.face_value * (discount**periods)
-    macaulay /= price
-    return macaulay / (1 + ytm_p)
+    _, d1, _ = price_sensitivities(bond, ytm)
+    return -d1 / bond.price
 
 
 def calculate_convexity(bond: Bond, ytm: float) -> float:
     """
-    (Modified) convexity of the bond.
+    (Modified) convexity of the bond: (d2P/dy2) / price.
     """
-    price = bond.price
-    coupon = bond.get_coupon_payment()
-    periods = int(bond.get_number_of_payments())
-    freq = bond.payment_frequency
-    ytm_p = ytm / freq
-    discount = 1.0 / (1 + ytm_p)
-
-    conv = 0.0
-    for t in range(periods):
-        time = (t + 1) / freq
-        pv = coupon * (discount ** (t + 1))
-        conv += time * (time + 1 / freq) * pv
-    final_time = periods / freq
-    conv += final_time * (final_time + 1 / freq) * bond.face_value * (discount**periods)
-    return conv / (price * (1 + ytm_p) ** 2)
+    _, _, d2 = price_sensitivities(bond, ytm)
+    return d2 / bond.price
 
 
 def calculate_dv01(bond: Bond, ytm: float) -> float:
@@ -0,0 +1,244 @@
+# cashflows.py
+import numpy as np
+
+from vectorized import CHUNK_ROWS, bonds_to_arrays, select_rows
+
+# Resolution of the shared time grid; 12 steps a year places every annual,
+# semi-annual, quarterly and monthly coupon date exactly on a grid point
+GRID_PER_YEAR = 12
+
+
+def iter_cash_flows(arrays, chunk_rows=CHUNK_ROWS):
+    """
+    Every scheduled payment of every bond in `arrays`, one chunk of bonds at a time.
+    Yields (row, years, coupon, principal) arrays with one entry per payment date,
+    where `row` indexes into `arrays` and `years` is the time of the payment.
+    """
+    size = len(arrays["price"])
+    for start in range(0, size, chunk_rows):
+        stop = min(start + chunk_rows, size)
+        periods = arrays["periods"][start:stop]
+        counts = np.maximum(periods, 0)
+        total = int(counts.sum())
+        if not total:
+            continue
+        local = np.repeat(np.arange(stop - start), counts)
+        # Period number within each bond: 1, 2, ..., n for each row in turn
+        first = np.cumsum(counts) - counts
+        period = np.arange(total) - np.repeat(first, counts) + 1
+        freq = arrays["frequency"][start:stop][local]
+        coupon = arrays["coupon"][start:stop][local]
+        principal = np.where(
+            period == periods[local], arrays["face_value"][start:stop][local], 0.0
+        )
+        yield local + start, period / freq, coupon, principal
+
+
+def grid_index(years, grid_per_year=GRID_PER_YEAR):
+    return np.rint(np.asarray(years) * grid_per_year).astype(np.int64)
+
+
+class CashFlowAggregate:
+    def __init__(self, grid_per_year=GRID_PER_YEAR):
+        """
+        Net cash flows of a set of positions on one shared time grid, together with their
+        total clean price. Positions can be added or removed incrementally, and the yield of
+        the whole set is a single IRR solve on the aggregated stream.
+        """
+        self.grid_per_year = grid_per_year
+        self.amounts = np.zeros(0)
+        self.total_price = 0.0
+        self.count = 0
+
+    def _scatter(self, arrays, quantity, sign):
+        size = len(arrays["price"])
+        quantity = (
+            np.ones(size)
+            if quantity is None
+            else np.broadcast_to(np.asarray(quantity, dtype=float), (size,))
+        )
+        for rows, years, coupon, principal in iter_cash_flows(arrays):
+            index = grid_index(years, self.grid_per_year)
+            if index.max() >= len(self.amounts):
+                grown = np.zeros(int(index.max()) + 1)
+                grown[: len(self.amounts)] = self.amounts
+                self.amounts = grown
+            self.amounts += sign * np.bincount(
+                index,
+                weights=(coupon + principal) * quantity[rows],
+                minlength=len(self.amounts),
+            )
+        self.total_price += sign * float((arrays["price"] * quantity).sum())
+        self.count += sign * size
+
+    def add_arrays(self, arrays, quantity=None):
+        self._scatter(arrays, quantity, 1)
+
+    def remove_arrays(self, arrays, quantity=None):
+        self._scatter(arrays, quantity, -1)
+
+    def add_bonds(self, bonds, quantity=None):
+        self.add_arrays(bonds_to_arrays(bonds), quantity)
+
+    def remove_bonds(self, bonds, quantity=None):
+        self.remove_arrays(bonds_to_arrays(bonds), quantity)
+
+    @property
+    def times(self):
+        return np.arange(len(self.amounts)) / self.grid_per_year
+
+    def present_value(self, annual_yield):
+        """
+        Value of the aggregated stream at an annually compounded yield.
+        """
+        return float((self.amounts * (1 + annual_yield) ** -self.times).sum())
+
+    def irr(self, tol=1e-8, max_iter=100, bounds=(-0.99, 10.0)):
+        """
+        Annualized (effective) yield at which the aggregated cash flows are worth the total
+        clean price. For a single bond this equals `calculator.calculate_ytm`.
+        """
+        if not self.count or not self.total_price:
+            return 0.0
+        times = self.times
+        low, high = bounds
+        y = 0.05
+        for _ in range(max_iter):
+            discount = (1 + y) ** -times
+            diff = (self.amounts * discount).sum() - self.total_price
+            if abs(diff) < tol * self.total_price:
+                break
+            if diff > 0:
+                low = y
+            else:
+                high = y
+            slope = -(self.amounts * times * discount).sum() / (1 + y)
+            step = y - diff / slope if slope else None
+            y = step if step is not None and low < step < high else (low + high) / 2
+        return float(y)
+
+
+BUCKETS_PER_YEAR = {"monthly": 12, "quarterly": 4, "yearly": 1}
+
+
+def _filter(arrays, bond_types):
+    if bond_types is None:
+        return arrays
+    if isinstance(bond_types, str):
+        bond_types = [bond_types]
+    mask = np.isin(arrays["bond_type"], [t.lower() for t in bond_types])
+    return select_rows(arrays, mask)
+
+
+def cash_flow_ladder(arrays, bucket="quarterly", bond_types=None, quantity=None):
+    """
+    Coupon and principal receipts of every position summed into time buckets.
+    `bucket` is "monthly", "quarterly" or "yearly"; a bucket covers (start, end] in years.
+    `bond_types` restricts the ladder to e.g. ["fixed"]; `quantity` scales each position.
+    Returns a dict of equal-length arrays: bucket_start, bucket_end, coupon, principal, total.
+    """
+    if bucket not in BUCKETS_PER_YEAR:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS_PER_YEAR)}")
+    per_year = BUCKETS_PER_YEAR[bucket]
+    if quantity is not None:
+        arrays = dict(arrays, quantity=np.broadcast_to(quantity, arrays["price"].shape))
+    arrays = _filter(arrays, bond_types)
+    scale = arrays.get("quantity")
+
+    coupons = np.zeros(0)
+    principals = np.zeros(0)
+    for rows, years, coupon, principal in iter_cash_flows(arrays):
+        index = _bucket_index(years, per_year)
+        size = max(len(coupons), int(index.max()) + 1)
+        weights = 1.0 if scale is None else scale[rows]
+        coupons = _padded(coupons, size) + np.bincount(
+            index, weights=coupon * weights, minlength=size
+        )
+        principals = _padded(principals, size) + np.bincount(
+            index, weights=principal * weights, minlength=size
+        )
+
+    starts = np.arange(len(coupons)) / per_year
+    return {
+        "bucket_start": starts,
+        "bucket_end": starts + 1 / per_year,
+        "coupon": coupons,
+        "principal": principals,
+        "total": coupons + principals,
+    }
+
+
+def cash_flow_matrix(arrays, bucket="yearly"):
+    """
+    (n_buckets, n_bonds) matrix of each bond's cash flows per bucket, per unit of
+    market value, so that `matrix @ weights` is the ladder of a portfolio worth 1.
+    """
+    if bucket not in BUCKETS_PER_YEAR:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS_PER_YEAR)}")
+    per_year = BUCKETS_PER_YEAR[bucket]
+    n = len(arrays["price"])
+    flat = np.zeros(0)
+    for rows, years, coupon, principal in iter_cash_flows(arrays):
+        index = _bucket_index(years, per_year) * n + rows
+        size = max(len(flat), int(index.max()) + 1)
+        flat = _padded(flat, size) + np.bincount(
+            index, weights=coupon + principal, minlength=size
+        )
+    buckets = -(-len(flat) // n) if n else 0
+    return _padded(flat, buckets * n).reshape(buckets, n) / arrays["price"]
+
+
+def _bucket_index(years, per_year):
+    # Payments on a bucket boundary belong to the bucket that ends there
+    return np.maximum(np.ceil(np.round(years * per_year, 9)).astype(np.int64) - 1, 0)
+
+
+def _padded(values, size):
+    if len(values) == size:
+        return values
+    grown = np.zeros(size)
+    grown[: len(values)] = values
+    return grown
+
+
+def _format_each(values, fmt):
+    return np.array([fmt % value for value in values], dtype=object)
+
+
+def _format_unique(values, fmt):
+    # Payment times repeat across the whole book, so format each distinct one once
+    unique, inverse = np.unique(values, return_inverse=True)
+    return _format_each(unique, fmt)[inverse]
+
+
+def write_cash_flow_schedule(file, arrays, bond_types=None, position_ids=None):
+    """
+    Stream the full per-position payment schedule to `file` (a path or text file) as CSV,
+    one chunk of positions at a time, so memory stays flat however large the book is.
+    Columns: position, years, coupon, principal.
+    """
+    if position_ids is not None:
+        arrays = dict(arrays, position=np.asarray(position_ids))
+    arrays = _filter(arrays, bond_types)
+    ids = arrays.get("position")
+    handle = open(file, "w", newline="") if isinstance(file, str) else file
+    try:
+        handle.write("position,years,coupon,principal\n")
+        for rows, years, coupon, principal in iter_cash_flows(arrays):
+            # Rows arrive in order, so label and amount strings are formatted once per
+            # position and fanned out to its payments
+            first = rows[0]
+            local = rows - first
+            span = np.arange(first, rows[-1] + 1)
+            labels = span if ids is None else ids[span]
+            faces = _format_each(arrays["face_value"][span], "%.10g")[local]
+            columns = zip(
+                _format_each(labels, "%s")[local],
+                _format_unique(years, "%.6g"),
+                _format_each(arrays["coupon"][span], "%.10g")[local],
+                np.where(principal != 0, faces, "0"),
+            )
+            handle.write("\n".join(map(",".join, columns)) + "\n")
+    finally:
+        if handle is not file:
+            handle.close()
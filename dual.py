@@ -0,0 +1,91 @@
+# dual.py
+import numpy as np
+
+
+class Dual2:
+    # Make NumPy scalars and arrays defer to Dual2's reflected operators
+    __array_ufunc__ = None
+
+    def __init__(self, value, d1=0.0, d2=0.0):
+        """
+        Second-order forward-mode dual number: a value with its first and second
+        derivatives with respect to one input. Components may be NumPy arrays, so a whole
+        cash-flow schedule (or a whole book) is differentiated in one evaluation.
+        """
+        self.value = value
+        self.d1 = d1
+        self.d2 = d2
+
+    @classmethod
+    def variable(cls, value):
+        """
+        Seed an independent variable: d/dx x = 1, d2/dx2 x = 0.
+        """
+        return cls(
+            value, np.ones_like(value, dtype=float), np.zeros_like(value, dtype=float)
+        )
+
+    def __repr__(self):
+        return f"Dual2({self.value!r}, {self.d1!r}, {self.d2!r})"
+
+    def __add__(self, other):
+        if isinstance(other, Dual2):
+            return Dual2(
+                self.value + other.value, self.d1 + other.d1, self.d2 + other.d2
+            )
+        return Dual2(self.value + other, self.d1, self.d2)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Dual2(-self.value, -self.d1, -self.d2)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, Dual2):
+            return Dual2(
+                self.value * other.value,
+                self.d1 * other.value + self.value * other.d1,
+                self.d2 * other.value + 2 * self.d1 * other.d1 + self.value * other.d2,
+            )
+        return Dual2(self.value * other, self.d1 * other, self.d2 * other)
+
+    __rmul__ = __mul__
+
+    def reciprocal(self):
+        inv = 1.0 / self.value
+        return Dual2(inv, -self.d1 * inv**2, (2 * self.d1**2 * inv - self.d2) * inv**2)
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual2):
+            return self * other.reciprocal()
+        return Dual2(self.value / other, self.d1 / other, self.d2 / other)
+
+    def __rtruediv__(self, other):
+        return self.reciprocal() * other
+
+    def __pow__(self, exponent):
+        """
+        Power with a constant (scalar or array) exponent.
+        """
+        exponent = np.asarray(exponent, dtype=float)
+        outer = self.value**exponent
+        first = exponent * self.value ** (exponent - 1)
+        second = exponent * (exponent - 1) * self.value ** (exponent - 2)
+        return Dual2(
+            outer,
+            first * self.d1,
+            second * self.d1**2 + first * self.d2,
+        )
+
+    def sum(self, axis=None):
+        return Dual2(
+            np.sum(self.value, axis=axis),
+            np.sum(np.broadcast_to(self.d1, np.shape(self.value)), axis=axis),
+            np.sum(np.broadcast_to(self.d2, np.shape(self.value)), axis=axis),
+        )
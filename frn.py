@@ -0,0 +1,199 @@
+# frn.py
+from functools import lru_cache
+
+import numpy as np
+
+from bond import Bond
+
+TENOR_YEARS = {
+    "1M": 1 / 12,
+    "3M": 0.25,
+    "6M": 0.5,
+    "1Y": 1.0,
+    "2Y": 2.0,
+    "3Y": 3.0,
+    "5Y": 5.0,
+    "7Y": 7.0,
+    "10Y": 10.0,
+    "20Y": 20.0,
+    "30Y": 30.0,
+}
+
+
+@lru_cache(maxsize=256)
+def _projected_fixings(tenors, zero_rates, freq, periods):
+    """
+    Forward reference-rate fixings for `periods` coupon periods at `freq`.
+    Cached on the curve points so every floater on the same schedule shares one projection.
+    """
+    t = np.arange(periods + 1, dtype=float) / freq
+    z = np.interp(t, tenors, zero_rates)
+    df = np.exp(-z * t)
+    fixings = freq * (df[:-1] / df[1:] - 1)
+    fixings.flags.writeable = False
+    return fixings
+
+
+class ForwardCurve:
+    def __init__(self, tenors, zero_rates):
+        """
+        Zero curve from tenors (years) and continuously compounded zero rates (decimal).
+        Rates are interpolated linearly and held flat beyond the end points.
+        """
+        order = np.argsort(tenors)
+        self.tenors = tuple(float(tenors[i]) for i in order)
+        self.zero_rates = tuple(float(zero_rates[i]) for i in order)
+
+    @classmethod
+    def flat(cls, rate):
+        """
+        Flat curve at an annually compounded `rate`.
+        """
+        return cls([0.0, 30.0], [np.log1p(rate)] * 2)
+
+    @classmethod
+    def from_yield_curve(cls, yield_curve):
+        """
+        Build a curve from the {"1M": 5.3, "10Y": 4.2, ...} dict returned by
+        fred_fetch.fetch_yield_curve(). Yields are in percent and treated as annual zero rates.
+        """
+        points = [
+            (TENOR_YEARS[label], np.log1p(value / 100))
+            for label, value in yield_curve.items()
+            if label in TENOR_YEARS and value is not None
+        ]
+        if not points:
+            raise ValueError("Yield curve has no usable tenors")
+        tenors, zero_rates = zip(*points)
+        return cls(tenors, zero_rates)
+
+    def discount_factor(self, t):
+        z = np.interp(t, self.tenors, self.zero_rates)
+        return np.exp(-z * np.asarray(t, dtype=float))
+
+    def forward_rates(self, freq, periods):
+        """
+        Simple forward rates for each of the next `periods` coupon periods.
+        """
+        return _projected_fixings(self.tenors, self.zero_rates, int(freq), int(periods))
+
+
+def project_coupons(bond: Bond, curve: ForwardCurve) -> np.ndarray:
+    """
+    Coupon cash flows of a floating-rate bond projected off `curve`.
+    The first coupon has already fixed at the bond's market reference rate.
+    """
+    freq = bond.payment_frequency
+    periods = int(bond.get_number_of_payments())
+    index = np.array(curve.forward_rates(freq, periods))
+    if periods:
+        index[0] = bond.market_reference_rate
+    return bond.face_value * (index + bond.quoted_spread) / freq
+
+
+def _frn_arrays(bonds, curve):
+    """
+    Stack the projected schedules of `bonds` into padded (n_bonds, max_periods) arrays.
+    """
+    n = len(bonds)
+    periods = np.array([int(b.get_number_of_payments()) for b in bonds])
+    width = max(int(periods.max(initial=0)), 1)
+    cash_flows = np.zeros((n, width))
+    index = np.zeros((n, width))
+    mask = np.arange(width) < periods[:, None]
+    freq = np.array([b.payment_frequency for b in bonds], dtype=float)
+    price = np.array([b.price for b in bonds], dtype=float)
+
+    for i, bond in enumerate(bonds):
+        p = periods[i]
+        if not p:
+            # Nothing left but principal, as in calculator.price_from_ytm
+            cash_flows[i, 0] = bond.face_value
+            continue
+        fwd = np.array(curve.forward_rates(bond.payment_frequency, p))
+        fwd[0] = bond.market_reference_rate
+        index[i, :p] = fwd
+        cash_flows[i, :p] = (
+            bond.face_value * (fwd + bond.quoted_spread) / bond.payment_frequency
+        )
+        cash_flows[i, p - 1] += bond.face_value
+    return cash_flows, index, mask, freq, price
+
+
+def _price_and_slope(cash_flows, index, mask, freq, dm):
+    """
+    Price of each row discounted at projected index + discount margin, and dPrice/dDM.
+    """
+    period_rate = 1 + (index + dm[:, None]) / freq[:, None]
+    period_rate = np.where(mask, period_rate, 1.0)
+    discount = np.cumprod(1.0 / period_rate, axis=1)
+    pv = cash_flows * discount
+    # d(discount_k)/d(dm) = -discount_k / freq * sum_{j<=k} 1 / period_rate_j
+    sensitivity = np.cumsum(np.where(mask, 1.0 / period_rate, 0.0), axis=1)
+    slope = -(pv * sensitivity).sum(axis=1) / freq
+    return pv.sum(axis=1), slope
+
+
+def frn_price_from_dm(bond: Bond, dm: float, curve: ForwardCurve) -> float:
+    """
+    Clean price of a floating-rate bond for a given discount margin (decimal).
+    """
+    cash_flows, index, mask, freq, _ = _frn_arrays([bond], curve)
+    price, _ = _price_and_slope(
+        cash_flows, index, mask, freq, np.array([dm], dtype=float)
+    )
+    return float(price[0])
+
+
+def solve_discount_margins(
+    bonds, curve: ForwardCurve, tol=1e-8, max_iter=50, dm_bounds=(-0.5, 1.0)
+) -> np.ndarray:
+    """
+    Solve the discount margin of every floating-rate bond in `bonds` at once.
+    Vectorized Newton-Raphson on the whole book, with a bisection step for rows that overshoot.
+    Rows without a margin come back NaN: bonds with no coupon periods left, and prices
+    that no margin within `dm_bounds` reproduces to `tol`.
+    """
+    bonds = list(bonds)
+    if not bonds:
+        return np.zeros(0)
+    cash_flows, index, mask, freq, target = _frn_arrays(bonds, curve)
+    spread = np.array([b.quoted_spread for b in bonds], dtype=float)
+
+    low = np.full(len(bonds), dm_bounds[0])
+    high = np.full(len(bonds), dm_bounds[1])
+    dm = np.clip(spread, low, high)
+    for _ in range(max_iter):
+        price, slope = _price_and_slope(cash_flows, index, mask, freq, dm)
+        diff = price - target
+        done = np.abs(diff) < tol
+        if done.all():
+            break
+        # Price falls as DM rises, so a positive diff means the root is higher
+        low = np.where(diff > 0, dm, low)
+        high = np.where(diff <= 0, dm, high)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = dm - diff / slope
+        bad = ~np.isfinite(step) | (step <= low) | (step >= high)
+        dm = np.where(done, dm, np.where(bad, (low + high) / 2, step))
+    price, _ = _price_and_slope(cash_flows, index, mask, freq, dm)
+    solved = (np.abs(price - target) < tol) & mask.any(axis=1)
+    return np.where(solved, dm, np.nan)
+
+
+def calculate_discount_margin(bond: Bond, curve: ForwardCurve, tol=1e-8) -> float:
+    """
+    Discount margin of a single floating-rate bond.
+    """
+    return float(solve_discount_margins([bond], curve, tol=tol)[0])
+
+
+def calculate_frn_duration(bond: Bond, dm: float, curve: ForwardCurve) -> float:
+    """
+    Spread duration: -dPrice/dDM / Price.
+    """
+    cash_flows, index, mask, freq, _ = _frn_arrays([bond], curve)
+    price, slope = _price_and_slope(
+        cash_flows, index, mask, freq, np.array([dm], dtype=float)
+    )
+    return float(-slope[0] / price[0])
@@ -1,7 +1,7 @@
 # main.py
 
 from bond import Bond
-from calculator import calculate_ytm, calculate_duration, calculate_convexity
+from calculator import calculate_ytm, calculate_sensitivities
 from portfolio import BondPortfolio
 from live_data import fetch_bond_data
 from fred_fetch import fetch_yield_curve
@@ -159,8 +159,9 @@ def main():
         )
 
         ytm = calculate_ytm(bond)
-        duration = calculate_duration(bond, ytm)
-        convexity = calculate_convexity(bond, ytm)
+        sensitivities = calculate_sensitivities(bond, ytm)
+        duration = sensitivities["duration"]
+        convexity = sensitivities["convexity"]
         accrued_interest = bond.calculate_accrued_interest()
 
         # Add to portfolio
@@ -0,0 +1,254 @@
+# optimizer.py
+import numpy as np
+
+from cashflows import cash_flow_matrix
+from vectorized import analyze_arrays
+
+# Multipliers beyond this multiple of the cost and curvature scale mean the dual is
+# running off to infinity, i.e. the targets are out of reach
+DIVERGENCE_FACTOR = 1e7
+# Newton steps a warm start gets at the final curvature before falling back to a cold solve
+WARM_START_ITERATIONS = 10
+
+
+def project_capped_simplex(v, upper):
+    """
+    Euclidean projection of `v` onto {w : 0 <= w <= upper, sum(w) = 1}, i.e.
+    w = clip(v - tau, 0, upper) for the shift tau that makes the weights sum to 1.
+    The weight sum is piecewise linear in tau, kinked where a weight leaves `upper`
+    (tau = v - upper) or reaches 0 (tau = v), so tau is found exactly from one sort.
+    """
+    n = len(v)
+    if n * upper < 1:
+        raise ValueError(
+            f"Weights capped at {upper} cannot sum to 1 over {n} bonds; "
+            "max_weight * n_bonds must be at least 1"
+        )
+    kinks = np.concatenate([v - upper, v])
+    order = np.argsort(kinks, kind="stable")
+    kinks = kinks[order]
+    # Past each kink the sum's slope drops by one (weight unpinned from upper) or
+    # rises by one (weight hit zero)
+    slope = np.cumsum(np.where(order < n, -1.0, 1.0))
+    sums = n * upper + np.concatenate([[0.0], np.cumsum(slope[:-1] * np.diff(kinks))])
+    k = max(np.searchsorted(-sums, -1.0, side="right") - 1, 0)
+    tau = kinks[k] + (1.0 - sums[k]) / slope[k] if slope[k] else kinks[k]
+    w = np.clip(v - tau, 0.0, upper)
+    # Spread the rounding left over from the running sums across the free weights
+    free = (w > 0) & (w < upper)
+    if free.any():
+        w[free] = np.clip(w[free] + (1.0 - w.sum()) / free.sum(), 0.0, upper)
+    return w
+
+
+def _solve_dual(G, h, c, w0, curvature, max_weight, multipliers, tol, max_iter):
+    """
+    Newton iterations on the constraint multipliers of
+    min c @ w + curvature / 2 * ||w - w0||^2  s.t.  G @ w = h, w on the capped simplex.
+    Unreachable targets make the dual unbounded, so iteration also stops once the
+    multipliers outgrow anything a reachable target needs. Returns the (weights,
+    multipliers) with the smallest residual seen, and the iteration count.
+    """
+
+    def allocate(multipliers):
+        return project_capped_simplex(
+            w0 - (c + G.T @ multipliers) / curvature, max_weight
+        )
+
+    def dual_value(w, multipliers):
+        return c @ w + curvature / 2 * ((w - w0) ** 2).sum() + multipliers @ (G @ w - h)
+
+    w = allocate(multipliers)
+    ridge = 1e-12 * max(np.linalg.norm(G, 2) ** 2 / curvature, 1.0)
+    # Well past the scale of the cost and curvature terms the multipliers trade off,
+    # yet far enough below 1e16 that the projection keeps its precision
+    limit = DIVERGENCE_FACTOR * (np.abs(c).max(initial=0.0) + curvature)
+    best = (np.inf, w, multipliers)
+    iterations = 0
+    accepted = 1.0
+    while len(h) and iterations < max_iter:
+        residual = G @ w - h
+        error = np.abs(residual).max()
+        if error < best[0]:
+            best = (error, w, multipliers)
+        if error < tol or np.abs(multipliers).max() > limit:
+            break
+        iterations += 1
+        # Free weights move with the multipliers, less their mean so the weights
+        # still sum to one; weights at a bound stay put
+        free = G[:, (w > 0) & (w < max_weight)]
+        centered = free - free.mean(axis=1, keepdims=True) if free.size else free
+        hessian = centered @ centered.T / curvature + ridge * np.eye(len(h))
+        direction = np.linalg.solve(hessian, residual)
+        # Backtrack until the (concave) dual improves
+        value = dual_value(w, multipliers)
+        slope = residual @ direction
+        # Start from a little beyond the last accepted step: near a bound-heavy optimum
+        # full Newton steps overshoot, and each rejected trial costs a projection
+        step = min(1.0, 4 * accepted)
+        for _ in range(60):
+            trial = multipliers + step * direction
+            trial_w = allocate(trial)
+            if dual_value(trial_w, trial) >= value + 1e-4 * step * slope:
+                break
+            step /= 2
+        else:
+            break
+        multipliers, w, accepted = trial, trial_w, step
+    if not len(h):
+        return w, multipliers, iterations
+    if np.abs(G @ w - h).max() < best[0]:
+        best = (None, w, multipliers)
+    return best[1], best[2], iterations
+
+
+def _closest_weights(G, h, max_weight, w, max_iter):
+    """
+    Weights on the capped simplex minimizing ||G @ w - h||, by accelerated projected
+    gradient from `w`: the best reachable answer when the targets cannot all be met.
+    """
+    step = 1.0 / max(np.linalg.norm(G, 2) ** 2, 1e-12)
+    y, momentum = w, 1.0
+    for _ in range(max_iter):
+        next_w = project_capped_simplex(y - step * (G.T @ (G @ y - h)), max_weight)
+        next_momentum = (1 + np.sqrt(1 + 4 * momentum**2)) / 2
+        y = next_w + (momentum - 1) / next_momentum * (next_w - w)
+        w, momentum = next_w, next_momentum
+    return w
+
+
+def optimize_portfolio(
+    arrays,
+    analytics=None,
+    target_duration=None,
+    target_convexity=None,
+    cash_flow_target=None,
+    bucket="yearly",
+    cost=None,
+    current_weights=None,
+    turnover_penalty=0.0,
+    max_weight=1.0,
+    regularization=1e-6,
+    tol=1e-10,
+    max_iter=100,
+    warm_start=None,
+):
+    """
+    Choose market-value weights over a bond universe (0 <= w <= max_weight, sum w = 1)
+    that hit target duration, convexity and cash-flow profile at minimum cost and turnover.
+
+    Minimizes  cost @ w + turnover_penalty / 2 * ||w - current_weights||^2
+    subject to duration @ w = target_duration, convexity @ w = target_convexity and
+    cash_flow_matrix @ w = cash_flow_target (per unit of portfolio value, for the first
+    len(cash_flow_target) buckets), leaving out any target that is None.
+    `regularization` is the least curvature used when the turnover penalty is smaller,
+    which keeps a pure-cost problem well posed. Raises ValueError if max_weight * n_bonds
+    is below 1, since no weights could then sum to 1.
+
+    Only the handful of constraint multipliers are iterated: for given multipliers the
+    optimal weights are one projection onto the capped simplex, and the multipliers are
+    updated by Newton steps on the dual over the current free (active-set) weights.
+    `warm_start` takes a previous result and restarts from its multipliers at the final
+    curvature. With a turnover penalty, a re-solve after prices tick takes a few steps;
+    a near pure-cost problem (curvature at `regularization`) is so sensitive to cost
+    changes that the restart often misses its budget and the solve runs cold instead.
+
+    Returns a dict with weights, residuals per constraint (achieved minus target),
+    objective, multipliers, iterations and converged. If the targets cannot be reached
+    within the weight bounds, converged is False and the weights are the ones closest
+    to the targets (least squares over the constraints, each scaled to its largest
+    coefficient), still summing to 1.
+    """
+    n = len(arrays["price"])
+    if max_weight * n < 1:
+        raise ValueError(
+            f"max_weight {max_weight} is too small for {n} bonds to sum to 1"
+        )
+    if analytics is None and (
+        target_duration is not None or target_convexity is not None
+    ):
+        analytics = analyze_arrays(arrays)
+
+    rows, targets, names = [], [], []
+    if target_duration is not None:
+        rows.append(analytics["duration"][None, :])
+        targets.append([target_duration])
+        names.append("duration")
+    if target_convexity is not None:
+        rows.append(analytics["convexity"][None, :])
+        targets.append([target_convexity])
+        names.append("convexity")
+    if cash_flow_target is not None:
+        matrix = cash_flow_matrix(arrays, bucket)
+        size = len(cash_flow_target)
+        rows.append(np.vstack([matrix, np.zeros((size, n))])[:size])
+        targets.append(np.asarray(cash_flow_target, dtype=float))
+        names.append("cash_flows")
+    G = np.vstack(rows) if rows else np.zeros((0, n))
+    h = np.concatenate(targets) if targets else np.zeros(0)
+    # Scale each constraint row so duration (~5), convexity (~50) and cash flows (~0.05)
+    # converge to a comparable tolerance
+    scale = np.maximum(np.abs(G).max(axis=1, initial=0.0), 1e-12)
+    G = G / scale[:, None]
+    h = h / scale
+
+    c = np.zeros(n) if cost is None else np.asarray(cost, dtype=float)
+    w0 = np.full(n, 1.0 / n) if current_weights is None else np.asarray(current_weights)
+    curvature = max(turnover_penalty, regularization)
+
+    # A warm start restarts at the final curvature from the previous multipliers. After
+    # a small tick that is a few Newton steps; if it does not settle within a short
+    # budget the targets moved too far, and the cold path below takes over
+    iterations = 0
+    w = None
+    if warm_start is not None and len(warm_start["multipliers"]) == len(h):
+        w, multipliers, iterations = _solve_dual(
+            G,
+            h,
+            c,
+            w0,
+            curvature,
+            max_weight,
+            np.array(warm_start["multipliers"], dtype=float),
+            tol,
+            min(WARM_START_ITERATIONS, max_iter),
+        )
+        if np.abs(G @ w - h).max(initial=0.0) >= tol:
+            w = None
+    if w is None:
+        # Cold solves follow a path of decreasing curvature: each smoother problem
+        # converges in a few steps and seeds the multipliers of the next
+        multipliers = np.zeros(len(h))
+        for path in 10.0 ** np.arange(np.ceil(np.log10(curvature)), 1)[::-1][:-1]:
+            _, multipliers, steps = _solve_dual(
+                G, h, c, w0, path, max_weight, multipliers, np.sqrt(tol), max_iter
+            )
+            iterations += steps
+        w, multipliers, steps = _solve_dual(
+            G, h, c, w0, curvature, max_weight, multipliers, tol, max_iter
+        )
+        iterations += steps
+    error = np.abs(G @ w - h).max(initial=0.0)
+    converged = error < tol
+    # Fall back to the closest weights only when the targets are clearly missed; a
+    # nearly converged answer keeps its cost optimality
+    if error >= np.sqrt(tol):
+        closest = _closest_weights(G, h, max_weight, w, 10 * max_iter)
+        if np.abs(G @ closest - h).max() < error:
+            w = closest
+
+    violation = (G @ w - h) * scale
+    residuals = {}
+    offset = 0
+    for name, target in zip(names, targets):
+        part = violation[offset : offset + len(target)]
+        residuals[name] = part if name == "cash_flows" else float(part[0])
+        offset += len(target)
+    return {
+        "weights": w,
+        "residuals": residuals,
+        "objective": float(c @ w + turnover_penalty / 2 * ((w - w0) ** 2).sum()),
+        "multipliers": multipliers,
+        "iterations": iterations,
+        "converged": bool(converged),
+    }
@@ -1,13 +1,20 @@
 # portfolio.py
+from cashflows import CashFlowAggregate
+from risk_groups import GroupIndex
+from vectorized import bonds_to_arrays
 
 
 class BondPortfolio:
     def __init__(self):
         self.bonds = []
+        self.cash_flows = CashFlowAggregate()
+        self.risk_groups = GroupIndex()
 
-    def add_bond(self, bond, ytm, duration, convexity, accrued_interest):
+    def add_bond(self, bond, ytm, duration, convexity, accrued_interest, tags=None):
         """
         Add a bond and its analytics to the portfolio.
+        `tags` is an optional {dimension: label} dict, e.g. {"sector": "banks"},
+        used by risk_breakdown.
         """
         clean_price = bond.price
         self.bonds.append(
@@ -19,8 +26,71 @@ class BondPortfolio:
                 "accrued_interest": accrued_interest,
                 "clean_price": clean_price,
                 "dirty_price": clean_price + accrued_interest,
+                "tags": tags or {},
             }
         )
+        self.cash_flows.add_bonds([bond])
+        self.risk_groups.add_position(bond, duration, convexity, tags)
+
+    def add_bonds(
+        self, bonds, ytm, duration, convexity, accrued_interest, tags=None, arrays=None
+    ):
+        """
+        Add many bonds at once; analytics are aligned arrays, one entry per bond, as
+        returned by `vectorized.analyze_arrays`. `tags` is an optional list of
+        {dimension: label} dicts or a {dimension: labels} mapping. Pass `arrays` when
+        the column arrays are already built, to skip rebuilding them from `bonds`.
+        """
+        bonds = list(bonds)
+        if arrays is None:
+            arrays = bonds_to_arrays(bonds)
+        if isinstance(tags, dict):
+            rows = [
+                {name: labels[i] for name, labels in tags.items()}
+                for i in range(len(bonds))
+            ]
+        else:
+            rows = tags or [None] * len(bonds)
+        for i, bond in enumerate(bonds):
+            clean_price = bond.price
+            self.bonds.append(
+                {
+                    "bond": bond,
+                    "ytm": float(ytm[i]),
+                    "duration": float(duration[i]),
+                    "convexity": float(convexity[i]),
+                    "accrued_interest": float(accrued_interest[i]),
+                    "clean_price": clean_price,
+                    "dirty_price": clean_price + float(accrued_interest[i]),
+                    "tags": rows[i] or {},
+                }
+            )
+        self.cash_flows.add_arrays(arrays)
+        self.risk_groups.add_positions(
+            remaining_years=arrays["remaining_years"],
+            bond_type=arrays["bond_type"],
+            day_count=arrays["day_count"],
+            price=arrays["price"],
+            duration=duration,
+            convexity=convexity,
+            tags=tags,
+        )
+
+    def remove_bond(self, index):
+        """
+        Remove the bond at `index` and return its analytics entry.
+        """
+        bond_info = self.bonds.pop(index)
+        self.cash_flows.remove_bonds([bond_info["bond"]])
+        self.risk_groups.remove_positions([index])
+        return bond_info
+
+    def risk_breakdown(self, dimensions=None):
+        """
+        Clean value, DV01, duration and convexity by maturity bucket, bond type,
+        day count and any tag dimensions used in add_bond.
+        """
+        return self.risk_groups.breakdown(dimensions)
 
     def total_clean_value(self):
         """
@@ -46,6 +116,13 @@ class BondPortfolio:
             / total_clean
         )
 
+    def calculate_portfolio_yield(self):
+        """
+        Portfolio internal rate of return: the single yield at which the netted cash flows
+        of every bond are worth the total clean value.
+        """
+        return self.cash_flows.irr()
+
     def calculate_weighted_duration(self):
         """
         Weighted average modified duration based on clean prices.
@@ -76,17 +153,32 @@ class BondPortfolio:
             / total_clean
         )
 
+    def summary(self):
+        """
+        Portfolio summary figures as a dict, for reports and other non-interactive callers.
+        """
+        return {
+            "number_of_bonds": len(self.bonds),
+            "total_clean_value": self.total_clean_value(),
+            "total_dirty_value": self.total_dirty_value(),
+            "weighted_ytm": self.calculate_weighted_ytm(),
+            "portfolio_yield": self.calculate_portfolio_yield(),
+            "weighted_duration": self.calculate_weighted_duration(),
+            "weighted_convexity": self.calculate_weighted_convexity(),
+        }
+
     def display_portfolio_summary(self):
         """
         Print a full summary of the bond portfolio.
         """
-        total_clean = self.total_clean_value()
+        summary = self.summary()
         print("\n---- Portfolio Summary ----")
-        print(f"Number of Bonds: {len(self.bonds)}")
-        print(f"Total Clean Value: ${total_clean:,.2f}")
-        print(f"Total Dirty Value: ${self.total_dirty_value():,.2f}")
-        print(f"Weighted Average YTM: {self.calculate_weighted_ytm() * 100:.2f}%")
+        print(f"Number of Bonds: {summary['number_of_bonds']}")
+        print(f"Total Clean Value: ${summary['total_clean_value']:,.2f}")
+        print(f"Total Dirty Value: ${summary['total_dirty_value']:,.2f}")
+        print(f"Weighted Average YTM: {summary['weighted_ytm'] * 100:.2f}%")
+        print(f"Portfolio Yield (IRR): {summary['portfolio_yield'] * 100:.2f}%")
         print(
-            f"Weighted Average Modified Duration: {self.calculate_weighted_duration():.4f} years"
+            f"Weighted Average Modified Duration: {summary['weighted_duration']:.4f} years"
         )
-        print(f"Weighted Average Convexity: {self.calculate_convexity():.4f}")
+        print(f"Weighted Average Convexity: {summary['weighted_convexity']:.4f}")
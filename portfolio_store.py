@@ -0,0 +1,241 @@
+# portfolio_store.py
+import hashlib
+import json
+import sqlite3
+
+from bond import Bond
+from portfolio import BondPortfolio
+from vectorized import analyze_bonds
+
+INPUT_COLUMNS = [
+    "face_value",
+    "coupon_rate",
+    "total_maturity_years",
+    "remaining_years",
+    "clean_price",
+    "payment_frequency",
+    "days_since_last_coupon",
+    "buyer_or_seller",
+    "day_count_convention",
+    "bond_type",
+    "market_reference_rate",
+    "quoted_spread",
+]
+ANALYTIC_COLUMNS = ["ytm", "duration", "convexity", "accrued_interest", "dv01"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS positions (
+    position_id TEXT PRIMARY KEY,
+    face_value REAL NOT NULL,
+    coupon_rate REAL NOT NULL,
+    total_maturity_years REAL NOT NULL,
+    remaining_years REAL NOT NULL,
+    clean_price REAL NOT NULL,
+    payment_frequency INTEGER NOT NULL,
+    days_since_last_coupon REAL NOT NULL,
+    buyer_or_seller TEXT NOT NULL,
+    day_count_convention TEXT NOT NULL,
+    bond_type TEXT NOT NULL,
+    market_reference_rate REAL NOT NULL,
+    quoted_spread REAL NOT NULL,
+    input_hash TEXT NOT NULL,
+    market_hash TEXT,
+    {", ".join(f"{column} REAL" for column in ANALYTIC_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_positions_maturity ON positions (remaining_years);
+CREATE INDEX IF NOT EXISTS idx_positions_bond_type ON positions (bond_type);
+CREATE INDEX IF NOT EXISTS idx_positions_stale ON positions (market_hash);
+"""
+
+
+def bond_inputs(bond: Bond) -> dict:
+    """
+    The `Bond` constructor arguments that determine its analytics, cast to the types
+    SQLite stores them as so that a bond read back hashes the same (1000 vs 1000.0).
+    """
+    return {
+        "face_value": float(bond.face_value),
+        "coupon_rate": float(bond.coupon_rate),
+        "total_maturity_years": float(bond.total_maturity_years),
+        "remaining_years": float(bond.remaining_years),
+        "clean_price": float(bond.price),
+        "payment_frequency": int(bond.payment_frequency),
+        "days_since_last_coupon": float(bond.days_since_last_coupon),
+        "buyer_or_seller": bond.buyer_or_seller,
+        "day_count_convention": bond.day_count_convention,
+        "bond_type": bond.bond_type,
+        "market_reference_rate": float(bond.market_reference_rate),
+        "quoted_spread": float(bond.quoted_spread),
+    }
+
+
+def content_hash(data) -> str:
+    """
+    Stable SHA-256 of any JSON-serializable value.
+    """
+    encoded = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class PortfolioStore:
+    def __init__(self, path="portfolio.db", market_data=None):
+        """
+        SQLite-backed positions with their cached analytics.
+        `market_data` is any JSON-serializable snapshot the analytics depend on
+        (for example a yield curve); when it changes every row becomes stale.
+        """
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.market_hash = content_hash(market_data)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def upsert_bonds(self, positions):
+        """
+        Insert or update positions from a {position_id: Bond} mapping.
+        Rows whose input hash is unchanged keep their cached analytics.
+        """
+        rows = []
+        for position_id, bond in positions.items():
+            inputs = bond_inputs(bond)
+            rows.append(
+                [str(position_id)]
+                + [inputs[c] for c in INPUT_COLUMNS]
+                + [content_hash(inputs)]
+            )
+        placeholders = ", ".join("?" * (len(INPUT_COLUMNS) + 2))
+        updates = ", ".join(
+            f"{c} = excluded.{c}" for c in INPUT_COLUMNS + ["input_hash"]
+        )
+        # A changed input hash clears market_hash, which marks the row for recomputation
+        with self.conn:
+            self.conn.executemany(
+                f"""
+                INSERT INTO positions (position_id, {", ".join(INPUT_COLUMNS)}, input_hash)
+                VALUES ({placeholders})
+                ON CONFLICT (position_id) DO UPDATE SET {updates}, market_hash = CASE
+                    WHEN positions.input_hash = excluded.input_hash THEN positions.market_hash
+                    ELSE NULL END
+                """,
+                rows,
+            )
+
+    def remove_positions(self, position_ids):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM positions WHERE position_id = ?",
+                [(str(p),) for p in position_ids],
+            )
+
+    def save_portfolio(self, portfolio: BondPortfolio, position_ids=None):
+        """
+        Store every bond in `portfolio`; ids default to the bond's index in the portfolio.
+        """
+        if position_ids is None:
+            position_ids = [str(i) for i in range(len(portfolio.bonds))]
+        self.upsert_bonds(
+            {pid: info["bond"] for pid, info in zip(position_ids, portfolio.bonds)}
+        )
+
+    def stale_count(self) -> int:
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM positions WHERE market_hash IS NULL OR market_hash != ?",
+            (self.market_hash,),
+        ).fetchone()[0]
+
+    def refresh(self) -> int:
+        """
+        Recompute analytics only for rows whose inputs or market data changed.
+        Returns the number of rows recomputed.
+        """
+        rows = self.conn.execute(
+            f"""
+            SELECT position_id, {", ".join(INPUT_COLUMNS)} FROM positions
+            WHERE market_hash IS NULL OR market_hash != ?
+            """,
+            (self.market_hash,),
+        ).fetchall()
+        if not rows:
+            return 0
+        bonds = [Bond(**dict(zip(INPUT_COLUMNS, row[1:]))) for row in rows]
+        results = analyze_bonds(bonds)
+        updates = [
+            [float(results[c][i]) for c in ANALYTIC_COLUMNS]
+            + [self.market_hash, row[0]]
+            for i, row in enumerate(rows)
+        ]
+        with self.conn:
+            self.conn.executemany(
+                f"""
+                UPDATE positions SET {", ".join(f"{c} = ?" for c in ANALYTIC_COLUMNS)},
+                    market_hash = ?
+                WHERE position_id = ?
+                """,
+                updates,
+            )
+        return len(rows)
+
+    def load_portfolio(self, bond_type=None, max_remaining_years=None) -> BondPortfolio:
+        """
+        Rebuild a `BondPortfolio` from stored rows, refreshing stale analytics first.
+        """
+        self.refresh()
+        query = f"SELECT {', '.join(INPUT_COLUMNS + ANALYTIC_COLUMNS)} FROM positions"
+        clauses, params = [], []
+        if bond_type is not None:
+            clauses.append("bond_type = ?")
+            params.append(bond_type.lower())
+        if max_remaining_years is not None:
+            clauses.append("remaining_years <= ?")
+            params.append(max_remaining_years)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        portfolio = BondPortfolio()
+        for row in self.conn.execute(query + " ORDER BY position_id", params):
+            bond = Bond(**dict(zip(INPUT_COLUMNS, row[: len(INPUT_COLUMNS)])))
+            ytm, duration, convexity, accrued_interest, _ = row[len(INPUT_COLUMNS) :]
+            portfolio.add_bond(bond, ytm, duration, convexity, accrued_interest)
+        return portfolio
+
+    def summary(self, group_by=None):
+        """
+        Portfolio totals computed in SQL, mirroring the `BondPortfolio` summary methods.
+        With `group_by="bond_type"` (or another input column) returns one row per group.
+        """
+        self.refresh()
+        if group_by is not None and group_by not in INPUT_COLUMNS:
+            raise ValueError(f"Cannot group by {group_by!r}")
+        key = f"{group_by}, " if group_by else ""
+        query = f"""
+            SELECT {key}COUNT(*), SUM(clean_price), SUM(clean_price + accrued_interest),
+                SUM(ytm * clean_price), SUM(duration * clean_price),
+                SUM(convexity * clean_price), SUM(dv01)
+            FROM positions
+        """
+        if group_by:
+            query += f" GROUP BY {group_by} ORDER BY {group_by}"
+        results = []
+        for row in self.conn.execute(query):
+            group, row = (row[0], row[1:]) if group_by else (None, row)
+            count, clean, dirty, ytm, duration, convexity, dv01 = row
+            clean = clean or 0.0
+            entry = {
+                "count": count,
+                "total_clean_value": clean,
+                "total_dirty_value": dirty or 0.0,
+                "weighted_ytm": ytm / clean if clean else 0.0,
+                "weighted_duration": duration / clean if clean else 0.0,
+                "weighted_convexity": convexity / clean if clean else 0.0,
+                "total_dv01": dv01 or 0.0,
+            }
+            if group_by:
+                entry[group_by] = group
+            results.append(entry)
+        return results if group_by else results[0]
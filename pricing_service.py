@@ -0,0 +1,325 @@
+# pricing_service.py
+import argparse
+import asyncio
+import inspect
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from bond import Bond
+from vectorized import analyze_bonds
+
+BOND_FIELDS = set(inspect.signature(Bond.__init__).parameters) - {"self"}
+REQUIRED_FIELDS = {
+    "face_value",
+    "coupon_rate",
+    "total_maturity_years",
+    "remaining_years",
+    "clean_price",
+}
+INT_FIELDS = {"payment_frequency"}
+STR_FIELDS = {"buyer_or_seller", "day_count_convention", "bond_type"}
+# Types the calculator prices; anything else would silently price as a zero-coupon bond
+BOND_TYPES = ("fixed", "floating", "callable", "putable")
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+
+def bond_from_payload(payload) -> Bond:
+    """
+    Build a `Bond` from a JSON object whose keys are `Bond` constructor arguments.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    unknown = set(payload) - BOND_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    missing = REQUIRED_FIELDS - set(payload)
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(sorted(missing))}")
+    bond = Bond(**{key: _coerce(key, value) for key, value in payload.items()})
+    if bond.bond_type not in BOND_TYPES:
+        raise ValueError(f"bond_type must be one of {', '.join(BOND_TYPES)}")
+    if bond.payment_frequency <= 0 or bond.remaining_years <= 0 or bond.price <= 0:
+        raise ValueError(
+            "payment_frequency, remaining_years and clean_price must be positive"
+        )
+    return bond
+
+
+def _coerce(field, value):
+    """
+    Check one payload value against the type its `Bond` argument needs, so bad input is
+    rejected here rather than failing a whole batch inside the vectorized pricer.
+    """
+    if field in STR_FIELDS:
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        return value
+    # JSON true/false would otherwise pass as 1/0
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{field} must be a number")
+    if not np.isfinite(value):
+        raise ValueError(f"{field} must be finite")
+    if field in INT_FIELDS:
+        if value != int(value):
+            raise ValueError(f"{field} must be an integer")
+        return int(value)
+    return float(value)
+
+
+def price_batch(bonds):
+    """
+    Analytics for a batch of bonds in one vectorized pass, one result dict per bond.
+    Non-finite values (e.g. a yield with no solution) come back as None, since JSON
+    has no NaN or Infinity.
+    """
+    results = analyze_bonds(bonds)
+    return [
+        {
+            key: float(values[i]) if np.isfinite(values[i]) else None
+            for key, values in results.items()
+        }
+        for i in range(len(bonds))
+    ]
+
+
+class LatencyMetrics:
+    def __init__(self, window=10000):
+        """
+        Rolling request latencies plus lifetime request and batch counters.
+        """
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record_request(self, seconds, ok=True):
+        self.latencies.append(seconds)
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+
+    def snapshot(self):
+        """
+        p50/p99 latency (ms) over the window, throughput (requests/s) and mean batch size.
+        """
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": (
+                self.batched_requests / self.batches if self.batches else 0.0
+            ),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            "throughput_rps": self.requests / elapsed if elapsed else 0.0,
+        }
+
+
+class MicroBatcher:
+    def __init__(self, handler, max_batch_size=64, max_wait_ms=2.0, metrics=None):
+        """
+        Coalesce concurrent `submit` calls into batches for `handler`.
+        A batch is dispatched when it reaches `max_batch_size` items or when its first
+        item has waited `max_wait_ms`, whichever comes first. `handler` takes a list of
+        items and returns a list of results in the same order; it runs in a worker thread
+        so the event loop keeps accepting requests while a batch is priced.
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self.queue = asyncio.Queue()
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            if self.metrics is not None:
+                self.metrics.record_batch(len(batch))
+            try:
+                results = await loop.run_in_executor(None, self.handler, items)
+            except Exception:
+                # Price the items one at a time so a bad item fails only its own request
+                for item, future in batch:
+                    try:
+                        result = await loop.run_in_executor(None, self.handler, [item])
+                    except Exception as e:
+                        if not future.done():
+                            future.set_exception(e)
+                    else:
+                        if not future.done():
+                            future.set_result(result[0])
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class PricingService:
+    def __init__(self, max_batch_size=64, max_wait_ms=2.0):
+        """
+        HTTP/JSON front end for the vectorized calculator.
+        POST /price takes one bond and returns its analytics; GET /metrics and GET /health
+        report service state.
+        """
+        self.metrics = LatencyMetrics()
+        self.batcher = MicroBatcher(
+            price_batch, max_batch_size, max_wait_ms, self.metrics
+        )
+
+    async def handle_price(self, body):
+        started = time.perf_counter()
+        try:
+            bond = bond_from_payload(json.loads(body or b"null"))
+        except (ValueError, TypeError, AttributeError) as e:
+            self.metrics.record_request(time.perf_counter() - started, ok=False)
+            return 400, {"error": str(e)}
+        try:
+            result = await self.batcher.submit(bond)
+        except Exception as e:
+            self.metrics.record_request(time.perf_counter() - started, ok=False)
+            return 500, {"error": str(e)}
+        self.metrics.record_request(time.perf_counter() - started)
+        return 200, result
+
+    async def route(self, method, path, body):
+        if method == "POST" and path == "/price":
+            return await self.handle_price(body)
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"No route for {method} {path}"}
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        data = json.dumps(payload, allow_nan=False).encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            ).encode()
+            + data
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The body cannot be delimited, so the connection cannot be reused
+                    error = {"error": "Invalid Content-Length header"}
+                    await self._respond(writer, 400, error, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.route(method.upper(), path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Pricing service listening on http://{host}:{port}")
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                await self.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local micro-batching bond pricing service"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    service = PricingService(args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# risk_groups.py
+import numpy as np
+
+DEFAULT_MATURITY_EDGES = (1, 3, 5, 10, 20)
+
+
+def maturity_labels(edges):
+    """
+    Bucket labels for remaining-years edges; each bucket includes its upper edge.
+    """
+    bounds = [0, *edges]
+    labels = [f"{lo:g}-{hi:g}y" for lo, hi in zip(bounds, bounds[1:])]
+    return labels + [f"{edges[-1]:g}y+"]
+
+
+class _Dimension:
+    def __init__(self, labels=()):
+        """
+        Label <-> integer code mapping for one grouping dimension.
+        """
+        self.labels = list(labels)
+        self.lookup = {label: code for code, label in enumerate(self.labels)}
+
+    def encode(self, values):
+        """
+        Codes for an array of labels, registering labels not seen before.
+        """
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, label in enumerate(uniques.tolist()):
+            if label not in self.lookup:
+                self.lookup[label] = len(self.labels)
+                self.labels.append(label)
+            mapping[i] = self.lookup[label]
+        return mapping[inverse.reshape(-1)]
+
+    def code(self, label):
+        """
+        Code for a single label, registering it if not seen before.
+        """
+        label = str(label)
+        if label not in self.lookup:
+            self.lookup[label] = len(self.labels)
+            self.labels.append(label)
+        return self.lookup[label]
+
+
+class GroupIndex:
+    def __init__(self, maturity_edges=DEFAULT_MATURITY_EDGES):
+        """
+        Group codes and risk weights for every position, kept in flat arrays so every
+        breakdown (maturity bucket, bond type, day count, user tags) is a single
+        `np.bincount` pass. Positions can be added and removed without rebuilding.
+        """
+        self.maturity_edges = np.asarray(maturity_edges, dtype=float)
+        self.dimensions = {
+            "maturity": _Dimension(maturity_labels(maturity_edges)),
+            "bond_type": _Dimension(),
+            "day_count": _Dimension(),
+        }
+        self.size = 0
+        # Buffers grow by doubling so appending one position at a time stays amortized
+        # O(1); only the first `size` rows are live
+        self.capacity = 0
+        self._codes = {name: np.zeros(0, dtype=np.int64) for name in self.dimensions}
+        # Per position: clean value, value * duration, value * convexity
+        self._weights = np.zeros((0, 3))
+
+    @property
+    def codes(self):
+        return {name: codes[: self.size] for name, codes in self._codes.items()}
+
+    @property
+    def weights(self):
+        return self._weights[: self.size]
+
+    def _reserve(self, size):
+        if size <= self.capacity:
+            return
+        capacity = max(size, 2 * self.capacity, 16)
+        for name, codes in self._codes.items():
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[: self.size] = codes[: self.size]
+            self._codes[name] = grown
+        grown = np.zeros((capacity, 3))
+        grown[: self.size] = self._weights[: self.size]
+        self._weights = grown
+        self.capacity = capacity
+
+    @classmethod
+    def from_portfolio(
+        cls, portfolio, tags=None, maturity_edges=DEFAULT_MATURITY_EDGES
+    ):
+        """
+        Index for a `BondPortfolio`; `tags` is an optional list of {dimension: label}
+        dicts, one per bond.
+        """
+        index = cls(maturity_edges)
+        bonds = [info["bond"] for info in portfolio.bonds]
+        index.add_positions(
+            remaining_years=[b.remaining_years for b in bonds],
+            bond_type=[b.bond_type for b in bonds],
+            day_count=[b.day_count_convention for b in bonds],
+            price=[info["clean_price"] for info in portfolio.bonds],
+            duration=[info["duration"] for info in portfolio.bonds],
+            convexity=[info["convexity"] for info in portfolio.bonds],
+            tags=tags,
+        )
+        return index
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays,
+        duration,
+        convexity,
+        tags=None,
+        maturity_edges=DEFAULT_MATURITY_EDGES,
+    ):
+        """
+        Index for vectorized column arrays (see `vectorized.bonds_to_arrays`).
+        `tags` is an optional {dimension: array of labels} mapping.
+        """
+        index = cls(maturity_edges)
+        index.add_positions(
+            remaining_years=arrays["remaining_years"],
+            bond_type=arrays["bond_type"],
+            day_count=arrays["day_count"],
+            price=arrays["price"],
+            duration=duration,
+            convexity=convexity,
+            tags=tags,
+        )
+        return index
+
+    def _add_dimension(self, name):
+        if name not in self.dimensions:
+            # Existing positions predate this dimension
+            self.dimensions[name] = _Dimension(["untagged"])
+            self._codes[name] = np.zeros(self.capacity, dtype=np.int64)
+
+    def _tag_codes(self, tags, count):
+        """
+        Codes for user tag dimensions from a list of per-position dicts or a
+        {dimension: labels} mapping; positions without a tag are "untagged".
+        """
+        if tags is None:
+            columns = {}
+        elif isinstance(tags, dict):
+            columns = {
+                name: np.asarray(values, dtype=str) for name, values in tags.items()
+            }
+        else:
+            names = {name for row in tags for name in (row or {})}
+            columns = {
+                name: np.array(
+                    [(row or {}).get(name, "untagged") for row in tags], dtype=str
+                )
+                for name in names
+            }
+        for name in columns:
+            self._add_dimension(name)
+        result = {}
+        for name, dimension in self.dimensions.items():
+            if name in ("maturity", "bond_type", "day_count"):
+                continue
+            if name in columns:
+                result[name] = dimension.encode(columns[name])
+            else:
+                result[name] = np.full(count, dimension.encode(["untagged"])[0])
+        return result
+
+    def add_positions(
+        self,
+        remaining_years,
+        bond_type,
+        day_count,
+        price,
+        duration,
+        convexity,
+        tags=None,
+    ):
+        """
+        Append positions. Array arguments are aligned, one entry per position.
+        """
+        price = np.asarray(price, dtype=float)
+        count = len(price)
+        new_codes = {
+            "maturity": np.searchsorted(
+                self.maturity_edges,
+                np.asarray(remaining_years, dtype=float),
+                side="left",
+            ),
+            "bond_type": self.dimensions["bond_type"].encode(bond_type),
+            "day_count": self.dimensions["day_count"].encode(day_count),
+            **self._tag_codes(tags, count),
+        }
+        self._reserve(self.size + count)
+        rows = slice(self.size, self.size + count)
+        for name, codes in new_codes.items():
+            self._codes[name][rows] = codes
+        self._weights[rows, 0] = price
+        self._weights[rows, 1] = price * np.asarray(duration, dtype=float)
+        self._weights[rows, 2] = price * np.asarray(convexity, dtype=float)
+        self.size += count
+
+    def add_position(self, bond, duration, convexity, tags=None):
+        """
+        Append one position, writing its codes in place without any array round trip.
+        """
+        tags = tags or {}
+        for name in tags:
+            self._add_dimension(name)
+        self._reserve(self.size + 1)
+        row = self.size
+        self._codes["maturity"][row] = np.searchsorted(
+            self.maturity_edges, bond.remaining_years, side="left"
+        )
+        self._codes["bond_type"][row] = self.dimensions["bond_type"].code(
+            bond.bond_type
+        )
+        self._codes["day_count"][row] = self.dimensions["day_count"].code(
+            bond.day_count_convention
+        )
+        for name, dimension in self.dimensions.items():
+            if name not in ("maturity", "bond_type", "day_count"):
+                self._codes[name][row] = dimension.code(tags.get(name, "untagged"))
+        price = float(bond.price)
+        self._weights[row] = (price, price * duration, price * convexity)
+        self.size += 1
+
+    def remove_positions(self, indices):
+        keep = np.ones(self.size, dtype=bool)
+        keep[np.asarray(indices, dtype=np.int64)] = False
+        size = int(keep.sum())
+        for codes in self._codes.values():
+            codes[:size] = codes[: self.size][keep]
+        self._weights[:size] = self._weights[: self.size][keep]
+        self.size = size
+
+    def breakdown(self, dimensions=None):
+        """
+        Count, clean value, DV01 and value-weighted duration/convexity per group, for
+        every requested dimension at once:
+        {dimension: {label: {"count", "clean_value", "dv01", "duration", "convexity"}}}.
+        """
+        names = list(self.dimensions) if dimensions is None else list(dimensions)
+        offsets = np.cumsum([0] + [len(self.dimensions[n].labels) for n in names])
+        # Shift each dimension's codes into its own range so one bincount covers them all
+        flat = np.concatenate([self.codes[n] + offsets[i] for i, n in enumerate(names)])
+        total = int(offsets[-1])
+        sums = [np.bincount(flat, minlength=total)]
+        for column in range(3):
+            sums.append(
+                np.bincount(
+                    flat,
+                    weights=np.tile(self.weights[:, column], len(names)),
+                    minlength=total,
+                )
+            )
+        count, value, value_duration, value_convexity = sums
+
+        result = {}
+        for i, name in enumerate(names):
+            groups = {}
+            for code, label in enumerate(self.dimensions[name].labels):
+                k = offsets[i] + code
+                if not count[k]:
+                    continue
+                groups[label] = {
+                    "count": int(count[k]),
+                    "clean_value": float(value[k]),
+                    "dv01": float(value_duration[k] * 0.0001),
+                    "duration": (
+                        float(value_duration[k] / value[k]) if value[k] else 0.0
+                    ),
+                    "convexity": (
+                        float(value_convexity[k] / value[k]) if value[k] else 0.0
+                    ),
+                }
+            result[name] = groups
+        return result
@@ -0,0 +1,236 @@
+# vectorized.py
+from math import factorial
+
+import numpy as np
+
+DAY_COUNT_BASIS = {"30/360": 360.0, "actual/360": 360.0, "actual/365": 365.0}
+
+# Rows per block for code that expands bonds into one entry per cash flow
+CHUNK_ROWS = 65536
+
+
+def bonds_to_arrays(bonds) -> dict:
+    """
+    Column arrays for a list of `Bond` objects, in the shape the vectorized functions expect.
+    """
+    bonds = list(bonds)
+    basis = np.array(
+        [DAY_COUNT_BASIS.get(b.day_count_convention, 365.0) for b in bonds]
+    )
+    freq = np.array([b.payment_frequency for b in bonds], dtype=float)
+    return {
+        "face_value": np.array([b.face_value for b in bonds], dtype=float),
+        "coupon": np.array([b.get_coupon_payment() for b in bonds], dtype=float),
+        "frequency": freq,
+        "periods": np.array(
+            [int(b.get_number_of_payments()) for b in bonds], dtype=np.int64
+        ),
+        "remaining_years": np.array([b.remaining_years for b in bonds], dtype=float),
+        "price": np.array([b.price for b in bonds], dtype=float),
+        "days_since_last_coupon": np.array(
+            [b.days_since_last_coupon for b in bonds], dtype=float
+        ),
+        "days_in_period": basis / freq,
+        "sign": np.array(
+            [-1.0 if b.buyer_or_seller == "seller" else 1.0 for b in bonds]
+        ),
+        "bond_type": np.array([b.bond_type for b in bonds], dtype=str),
+        "day_count": np.array([b.day_count_convention for b in bonds], dtype=str),
+    }
+
+
+def select_rows(arrays, rows) -> dict:
+    """
+    The subset of `arrays` at `rows` (a boolean mask or integer index array).
+    """
+    return {key: values[rows] for key, values in arrays.items()}
+
+
+def _power_sums(n):
+    """
+    sum_{t=1}^n t^k for k = 0..5.
+    """
+    return [
+        n,
+        n * (n + 1) / 2,
+        n * (n + 1) * (2 * n + 1) / 6,
+        (n * (n + 1) / 2) ** 2,
+        n * (n + 1) * (2 * n + 1) * (3 * n**2 + 3 * n - 1) / 30,
+        n**2 * (n + 1) ** 2 * (2 * n**2 + 2 * n - 1) / 12,
+    ]
+
+
+def _moments(arrays, ytm, rows=None):
+    """
+    Discounted cash-flow sums for each bond at nominal yield `ytm`:
+    (price, sum t*PV, sum t*(t+1)*PV) with t counted in periods.
+    Uses closed-form annuity sums, so the cost does not grow with the number of periods.
+    """
+    if rows is None:
+        rows = slice(None)
+    coupon = arrays["coupon"][rows]
+    face = arrays["face_value"][rows]
+    n = arrays["periods"][rows].astype(float)
+    r = (
+        np.broadcast_to(np.asarray(ytm, dtype=float), n.shape)
+        / arrays["frequency"][rows]
+    )
+
+    log_v = -np.log1p(r)
+    final = np.exp(n * log_v)  # v^n with v = 1 / (1 + r)
+
+    # The recurrences r*S0 = 1 - v^n, r*S1 = 1 + S0 - (n+1)v^n and
+    # r*S2 = 2(1 + S0 + S1) - (n+1)(n+2)v^n cancel badly as n*r -> 0,
+    # so near-zero yields use a Taylor expansion of v^t = exp(t*log_v) instead
+    small = np.abs(n * log_v) < 2e-3
+    safe = np.where(small, 1.0, r)
+    s0 = -np.expm1(n * log_v) / safe
+    s1 = (1 + s0 - (n + 1) * final) / safe
+    s2 = (2 * (1 + s0 + s1) - (n + 1) * (n + 2) * final) / safe
+    if small.any():
+        m = n[small]
+        x = log_v[small]
+        p = _power_sums(m)
+        # sum_t t^k v^t ~= sum_j x^j / j! * sum_t t^(k+j), for k = 0, 1, 2
+        taylor = [
+            sum(x**j / factorial(j) * p[k + j] for j in range(4)) for k in range(3)
+        ]
+        s0, s1, s2 = s0.copy(), s1.copy(), s2.copy()
+        s0[small] = taylor[0]
+        s1[small] = taylor[1]
+        s2[small] = taylor[2] + taylor[1]
+    return (
+        coupon * s0 + face * final,
+        coupon * s1 + n * face * final,
+        coupon * s2 + n * (n + 1) * face * final,
+    )
+
+
+def price_from_ytm_vec(arrays, ytm) -> np.ndarray:
+    """
+    Vectorized `calculator.price_from_ytm` for an annualized nominal yield per bond.
+    """
+    return _moments(arrays, ytm)[0]
+
+
+def calculate_ytm_vec(
+    arrays, tol=1e-6, max_iter=100, high_ytm_threshold=0.5, initial=None
+):
+    """
+    Vectorized `calculator.calculate_ytm`: solves every bond at once with Newton-Raphson,
+    falling back to bisection within [0.0001, high_ytm_threshold] for rows that overshoot.
+    `initial` optionally warm-starts the solve from nominal yields (e.g. a previous solution).
+    Returns annualized (effective) yields, as the scalar version does.
+    """
+    price = arrays["price"]
+    face = arrays["face_value"]
+    freq = arrays["frequency"]
+    if not len(price):
+        return np.zeros(0)
+
+    years = np.where(arrays["remaining_years"] > 0, arrays["remaining_years"], 1.0)
+    approx = (arrays["coupon"] * freq + (face - price) / years) / ((face + price) / 2)
+    low = np.full(price.shape, 0.0001)
+    high = np.full(price.shape, min(high_ytm_threshold, 1.0))
+    ytm = np.clip(approx if initial is None else initial, low, high)
+
+    # Only rows that have not converged are repriced on each pass
+    active = np.arange(len(price))
+    for _ in range(max_iter):
+        y, lo, hi = ytm[active], low[active], high[active]
+        calc_price, weighted, _ = _moments(arrays, y, active)
+        diff = price[active] - calc_price
+        # Rows whose root lies outside the bracket stop once it has collapsed onto an end
+        done = (np.abs(diff) < tol) | (hi - lo < 1e-12)
+        # Price falls as yield rises: calc_price above the target means the root is higher
+        lo = np.where(diff < 0, y, lo)
+        hi = np.where(diff > 0, y, hi)
+        f = freq[active]
+        derivative = -weighted / (f * (1 + y / f))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = y + diff / derivative
+        bad = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        ytm[active] = np.where(done, y, np.where(bad, (lo + hi) / 2, step))
+        low[active], high[active] = lo, hi
+        active = active[~done]
+        if not len(active):
+            break
+
+    return (1 + ytm / freq) ** freq - 1
+
+
+def nominal_from_effective(ytm, frequency):
+    """
+    Inverse of the effective-yield conversion `calculate_ytm_vec` applies.
+    """
+    return frequency * ((1 + ytm) ** (1 / frequency) - 1)
+
+
+def calculate_duration_vec(arrays, ytm) -> np.ndarray:
+    """
+    Vectorized `calculator.calculate_duration` (modified duration).
+    """
+    freq = arrays["frequency"]
+    _, weighted, _ = _moments(arrays, ytm)
+    macaulay = weighted / freq / arrays["price"]
+    return macaulay / (1 + ytm / freq)
+
+
+def calculate_convexity_vec(arrays, ytm) -> np.ndarray:
+    """
+    Vectorized `calculator.calculate_convexity`.
+    """
+    freq = arrays["frequency"]
+    _, _, second = _moments(arrays, ytm)
+    return second / freq**2 / (arrays["price"] * (1 + ytm / freq) ** 2)
+
+
+def calculate_accrued_interest_vec(arrays) -> np.ndarray:
+    """
+    Vectorized `Bond.calculate_accrued_interest`.
+    """
+    return (
+        arrays["sign"]
+        * arrays["coupon"]
+        * arrays["days_since_last_coupon"]
+        / arrays["days_in_period"]
+    )
+
+
+def calculate_risk_vec(arrays, ytm):
+    """
+    Modified duration and convexity together from one pass over the cash flows.
+    Returns (duration, convexity).
+    """
+    freq = arrays["frequency"]
+    price = arrays["price"]
+    _, weighted, second = _moments(arrays, ytm)
+    duration = weighted / freq / price / (1 + ytm / freq)
+    convexity = second / freq**2 / (price * (1 + ytm / freq) ** 2)
+    return duration, convexity
+
+
+def analyze_arrays(arrays) -> dict:
+    """
+    YTM, modified duration, convexity, DV01 and accrued interest for every bond,
+    matching what main.py computes one bond at a time.
+    """
+    ytm = calculate_ytm_vec(arrays)
+    price = arrays["price"]
+    duration, convexity = calculate_risk_vec(arrays, ytm)
+    accrued = calculate_accrued_interest_vec(arrays)
+    return {
+        "ytm": ytm,
+        "duration": duration,
+        "convexity": convexity,
+        "dv01": duration * price * 0.0001,
+        "accrued_interest": accrued,
+        "dirty_price": price + accrued,
+    }
+
+
+def analyze_bonds(bonds) -> dict:
+    """
+    Convenience wrapper: `analyze_arrays(bonds_to_arrays(bonds))`.
+    """
+    return analyze_arrays(bonds_to_arrays(bonds))
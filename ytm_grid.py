@@ -0,0 +1,125 @@
+# ytm_grid.py
+from collections import OrderedDict
+
+import numpy as np
+
+from bond import Bond
+from calculator import calculate_ytm, price_sensitivities
+from vectorized import price_from_ytm_vec
+
+
+class YieldGridCache:
+    def __init__(
+        self,
+        max_grids=256,
+        grid_points=2048,
+        accuracy=1e-10,
+        ytm_range=(0.0001, 0.5),
+    ):
+        """
+        Opt-in YTM inversion cache for bonds that share a structure (face value, coupon,
+        frequency and number of remaining payments). The first bond of a structure builds
+        a dense price -> yield grid; later bonds are answered by interpolation plus one
+        polishing Newton step. Grids are evicted least-recently-used beyond `max_grids`.
+        `accuracy` bounds the estimated yield error after the polishing step; answers that
+        miss it, or prices outside the grid, fall back to `calculate_ytm`.
+        """
+        self.max_grids = max_grids
+        self.grid_points = grid_points
+        self.accuracy = accuracy
+        self.ytm_range = ytm_range
+        self.grids = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.cold_answers = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def structure_key(bond: Bond):
+        return (
+            float(bond.face_value),
+            float(bond.get_coupon_payment()),
+            int(bond.payment_frequency),
+            int(bond.get_number_of_payments()),
+        )
+
+    def _build(self, key):
+        face, coupon, freq, periods = key
+        yields = np.linspace(*self.ytm_range, self.grid_points)
+        arrays = {
+            "face_value": np.full(self.grid_points, face),
+            "coupon": np.full(self.grid_points, coupon),
+            "frequency": np.full(self.grid_points, float(freq)),
+            "periods": np.full(self.grid_points, periods, dtype=np.int64),
+        }
+        prices = price_from_ytm_vec(arrays, yields)
+        # Price falls as yield rises; np.interp needs increasing x
+        return prices[::-1].copy(), yields[::-1].copy()
+
+    def _grid(self, key):
+        """
+        The grid for `key` and whether it was already cached.
+        """
+        grid = self.grids.get(key)
+        if grid is not None:
+            self.grids.move_to_end(key)
+            return grid, True
+        self.misses += 1
+        grid = self._build(key)
+        self.grids[key] = grid
+        if len(self.grids) > self.max_grids:
+            self.grids.popitem(last=False)
+            self.evictions += 1
+        return grid, False
+
+    def calculate_ytm(self, bond: Bond) -> float:
+        """
+        Annualized YTM of `bond`, with the same convention as `calculator.calculate_ytm`.
+        """
+        self.lookups += 1
+        key = self.structure_key(bond)
+        if key[3] <= 0:
+            self.fallbacks += 1
+            return calculate_ytm(bond)
+        (prices, yields), cached = self._grid(key)
+        price = bond.price
+        if not prices[0] <= price <= prices[-1]:
+            self.fallbacks += 1
+            return calculate_ytm(bond)
+
+        ytm = float(np.interp(price, prices, yields))
+        model, d1, d2 = price_sensitivities(bond, ytm)
+        step = (price - model) / d1
+        ytm += step
+        # Newton's error after one step is about |P'' / (2 P')| * step^2
+        if abs(d2 / (2 * d1)) * step**2 > self.accuracy:
+            self.fallbacks += 1
+            return calculate_ytm(bond)
+        if cached:
+            self.hits += 1
+        else:
+            self.cold_answers += 1
+        freq = bond.payment_frequency
+        return (1 + ytm / freq) ** freq - 1
+
+    def stats(self):
+        """
+        Every lookup is exactly one of: a hit (interpolated on a grid that was already
+        cached), a cold answer (interpolated on a grid built for it) or a fallback to
+        `calculate_ytm`. Misses count grid builds.
+        """
+        return {
+            "grids": len(self.grids),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "cold_answers": self.cold_answers,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "fallbacks": self.fallbacks,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+    def clear(self):
+        self.grids.clear()